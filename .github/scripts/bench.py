@@ -0,0 +1,137 @@
+# .github/scripts/bench.py
+# End-to-end benchmark for update_achievements.py. Each scenario runs the real script in a child
+# process against a local stand-in API (a synthetic account, or a recorded fixture archive) and
+# reports wall time, request count, bytes transferred and the child's peak RSS. Results can be
+# saved as a baseline and later runs compared against it.
+#
+# Usage:
+#   python .github/scripts/bench.py [--sizes 10 1000 10000] [--latency 0.0] [--backend rest]
+#   python .github/scripts/bench.py --fixture run.json.gz --username someone
+#   python .github/scripts/bench.py --save-baseline baseline.json
+#   python .github/scripts/bench.py --baseline baseline.json
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from fake_github import FakeGitHub, make_account
+from replay import ReplayServer
+
+BENCH_USERNAME = "bench-user"
+METRICS = ("wall_s", "requests", "bytes", "peak_rss_mb")
+
+
+def make_workdir(skills_config_path):
+    """Creates a throwaway checkout layout: README.md with both managed sections, plus the skills config."""
+    workdir = tempfile.mkdtemp(prefix="achievements-bench-")
+    os.makedirs(os.path.join(workdir, ".github", "scripts"))
+    shutil.copy(skills_config_path, os.path.join(workdir, ".github", "scripts", "skills_config.json"))
+    with open(skills_config_path, "r", encoding="utf-8") as f:
+        skills = json.load(f)["skills"]
+    circles = "\n".join(f'  <circle id="{skill["id"]}" cx="{10 * i}" cy="10" r="8" fill="#cccccc" />' for i, skill in enumerate(skills))
+    with open(os.path.join(workdir, "README.md"), "w", encoding="utf-8") as f:
+        f.write("# Bench profile\n\n<!-- ACHIEVEMENTS_START -->\n<!-- ACHIEVEMENTS_END -->\n\n"
+                f'<svg width="400" height="40">\n{circles}\n</svg>\n')
+    return workdir
+
+
+def run_script(api_url, username, backend, workdir):
+    """Runs update_achievements.py once. Returns (wall seconds, peak RSS in MiB, exit code)."""
+    env = dict(os.environ,
+               GITHUB_API_URL=api_url,
+               GITHUB_USERNAME=username,
+               GITHUB_TOKEN="bench-token",
+               GITHUB_DATA_BACKEND=backend,
+               GITHUB_HTTP_CACHE="", # Every run starts cold so results are comparable
+               GITHUB_STATE_FILE="",
+               GITHUB_API_RECORD="")
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(SCRIPTS_DIR, "update_achievements.py")],
+                               cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, rusage = os.wait4(process.pid, 0)
+    wall = time.perf_counter() - start
+    process.returncode = exit_code = os.waitstatus_to_exitcode(status) # Already reaped; keep Popen from waiting again
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak_rss = rusage.ru_maxrss / (1024 * 1024) if sys.platform == "darwin" else rusage.ru_maxrss / 1024
+    return wall, peak_rss, exit_code
+
+
+def run_scenario(name, server, username, backend, skills_config_path):
+    workdir = make_workdir(skills_config_path)
+    try:
+        with server:
+            wall, peak_rss, exit_code = run_script(server.url, username, backend, workdir)
+            result = {"wall_s": round(wall, 3), "requests": server.request_count, "bytes": server.bytes_sent,
+                      "peak_rss_mb": round(peak_rss, 1)}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    if exit_code != 0:
+        print(f"Warning: scenario '{name}' exited with status {exit_code}.")
+    return result
+
+
+def compare(results, baseline):
+    print("\nAgainst baseline:")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"  {name}: no baseline entry")
+            continue
+        deltas = []
+        for metric in METRICS:
+            before, after = baseline[name].get(metric), result[metric]
+            if before:
+                deltas.append(f"{metric} {100.0 * (after - before) / before:+.1f}%")
+        print(f"  {name}: " + ", ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark for update_achievements.py.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000], help="Synthetic account sizes (repos).")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every stand-in API response.")
+    parser.add_argument("--backend", choices=("rest", "graphql"), default="rest")
+    parser.add_argument("--fixture", help="Replay a recorded fixture archive instead of synthetic accounts.")
+    parser.add_argument("--username", help="Account the fixture was recorded for (required with --fixture).")
+    parser.add_argument("--skills-config", default=os.path.join(SCRIPTS_DIR, "skills_config.json"))
+    parser.add_argument("--save-baseline", metavar="FILE", help="Write the results as a baseline file.")
+    parser.add_argument("--baseline", metavar="FILE", help="Compare the results with a saved baseline.")
+    args = parser.parse_args()
+
+    scenarios = []
+    if args.fixture:
+        if not args.username:
+            parser.error("--username is required with --fixture")
+        scenarios.append((f"replay:{os.path.basename(args.fixture)}",
+                          lambda: ReplayServer.from_archive(args.fixture, args.latency), args.username))
+    else:
+        for size in args.sizes:
+            # No primary rate limit here: a 10k-repo account would otherwise wait for the hourly reset
+            scenarios.append((f"synthetic:{size}",
+                              lambda size=size: FakeGitHub(make_account(BENCH_USERNAME, size), latency=args.latency, rate_limit=10 ** 9),
+                              BENCH_USERNAME))
+
+    results = {}
+    print(f"{'scenario':<28}{'wall (s)':>10}{'requests':>10}{'KiB':>10}{'peak RSS (MiB)':>16}")
+    for name, make_server, username in scenarios:
+        result = run_scenario(name, make_server(), username, args.backend, args.skills_config)
+        results[name] = result
+        print(f"{name:<28}{result['wall_s']:>10.2f}{result['requests']:>10}{result['bytes'] // 1024:>10}{result['peak_rss_mb']:>16.1f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
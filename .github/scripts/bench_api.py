@@ -0,0 +1,48 @@
+# .github/scripts/bench_api.py
+# Benchmarks get_user_stats against a local fake GitHub API with injected latency,
+# comparing sequential fetching with the pooled concurrent fetch engine.
+#
+# Usage: python .github/scripts/bench_api.py [--repos 200] [--latency 0.05] [--concurrency 1 8 16]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import update_achievements as ua
+from fake_github import FakeGitHub, make_account
+
+
+def run_once(account, latency, concurrency):
+    with FakeGitHub(account, latency=latency) as fake:
+        ua.GITHUB_API_URL = fake.url
+        ua.GITHUB_API_CONCURRENCY = concurrency
+        ua.close_session()
+        start = time.perf_counter()
+        total_commits, total_repos = ua.get_user_stats(account["user"]["login"], None)
+        elapsed = time.perf_counter() - start
+        ua.close_session()
+        return elapsed, fake.request_count, total_commits, total_repos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark get_user_stats against a fake GitHub API.")
+    parser.add_argument("--repos", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every fake API response")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 16])
+    args = parser.parse_args()
+
+    account = make_account("bench-user", args.repos)
+    print(f"Fake account: {args.repos} repos, {args.latency * 1000:.0f} ms latency per request")
+    baseline = None
+    for concurrency in args.concurrency:
+        elapsed, requests_made, total_commits, _ = run_once(account, args.latency, concurrency)
+        baseline = baseline or elapsed
+        print(f"  concurrency={concurrency:<3} {elapsed:7.2f}s  {requests_made} requests  "
+              f"commits={total_commits}  speedup={baseline / elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# .github/scripts/bench_decode.py
+# Measures parse time and memory for repository listing pages: full json.loads dict trees (the
+# previous behaviour, with every page kept for the whole run) versus compact RepoRecord decoding.
+# Pages are shaped like real /users/{user}/repos responses (~80 fields per repository).
+#
+# Usage: python .github/scripts/bench_decode.py [--repos 10000]
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from repo_records import decode_repo_page
+
+API = "https://api.github.com"
+
+
+def full_repo(owner, i):
+    """A repository object with the field set the REST API returns."""
+    name = f"repo-{i:05d}"
+    url = f"{API}/repos/{owner}/{name}"
+    repo = {
+        "id": 100000 + i, "node_id": f"R_kgDO{i:08d}", "name": name, "full_name": f"{owner}/{name}", "private": False,
+        "owner": {"login": owner, "id": 4242, "node_id": "U_kgDOAAAQkg", "avatar_url": "https://avatars.githubusercontent.com/u/4242?v=4",
+                  "gravatar_id": "", "url": f"{API}/users/{owner}", "html_url": f"https://github.com/{owner}",
+                  "followers_url": f"{API}/users/{owner}/followers", "following_url": f"{API}/users/{owner}/following{{/other_user}}",
+                  "gists_url": f"{API}/users/{owner}/gists{{/gist_id}}", "starred_url": f"{API}/users/{owner}/starred{{/owner}}{{/repo}}",
+                  "subscriptions_url": f"{API}/users/{owner}/subscriptions", "organizations_url": f"{API}/users/{owner}/orgs",
+                  "repos_url": f"{API}/users/{owner}/repos", "events_url": f"{API}/users/{owner}/events{{/privacy}}",
+                  "received_events_url": f"{API}/users/{owner}/received_events", "type": "User", "site_admin": False},
+        "html_url": f"https://github.com/{owner}/{name}", "description": f"Synthetic repository number {i} for decoding benchmarks.",
+        "fork": i % 10 == 0, "url": url, "created_at": "2021-03-04T05:06:07Z", "updated_at": "2025-01-02T03:04:05Z",
+        "pushed_at": "2025-01-02T03:04:05Z", "git_url": f"git://github.com/{owner}/{name}.git", "ssh_url": f"git@github.com:{owner}/{name}.git",
+        "clone_url": f"https://github.com/{owner}/{name}.git", "svn_url": f"https://github.com/{owner}/{name}", "homepage": None,
+        "size": 1234, "stargazers_count": i % 50, "watchers_count": i % 50, "language": ["Python", "Go", "Rust", None][i % 4],
+        "has_issues": True, "has_projects": True, "has_downloads": True, "has_wiki": True, "has_pages": False,
+        "has_discussions": False, "forks_count": 0, "mirror_url": None, "archived": False, "disabled": False,
+        "open_issues_count": 0, "license": {"key": "mit", "name": "MIT License", "spdx_id": "MIT", "url": f"{API}/licenses/mit", "node_id": "MDc6TGljZW5zZTEz"},
+        "allow_forking": True, "is_template": False, "web_commit_signoff_required": False,
+        "topics": ["climate", "python", "cli"][: i % 4], "visibility": "public", "forks": 0, "open_issues": 0,
+        "watchers": i % 50, "default_branch": "main",
+    }
+    for suffix in ("forks", "keys", "collaborators", "teams", "hooks", "issue_events", "events", "assignees", "branches",
+                   "tags", "blobs", "git_tags", "git_refs", "trees", "statuses", "languages", "stargazers", "contributors",
+                   "subscribers", "subscription", "commits", "git_commits", "comments", "issue_comment", "contents",
+                   "compare", "merges", "archive", "downloads", "issues", "pulls", "milestones", "notifications",
+                   "labels", "releases", "deployments"):
+        repo[f"{suffix}_url"] = f"{url}/{suffix}"
+    return repo
+
+
+def measure(label, pages, decode):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = []
+    for page in pages:
+        kept.extend(decode(page))
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<22} {elapsed * 1000:8.1f} ms   retained {current / 2**20:7.1f} MiB   peak {peak / 2**20:7.1f} MiB")
+    return kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark repository page decoding.")
+    parser.add_argument("--repos", type=int, default=10000)
+    args = parser.parse_args()
+
+    owner = "bench-user"
+    pages = []
+    for start in range(0, args.repos, 100):
+        pages.append(json.dumps([full_repo(owner, i) for i in range(start, min(start + 100, args.repos))]).encode("utf-8"))
+    print(f"{args.repos} repos in {len(pages)} pages, {sum(map(len, pages)) / 2**20:.1f} MiB of JSON:")
+
+    full = measure("json.loads (full)", pages, json.loads)
+    compact = measure("RepoRecord (compact)", pages, decode_repo_page)
+    assert [(r['name'], r['fork'], r['language'], r['owner']['login'], r['topics']) for r in full] == \
+           [(r['name'], r['fork'], r['language'], r['owner']['login'], r['topics']) for r in compact]
+
+
+if __name__ == "__main__":
+    main()
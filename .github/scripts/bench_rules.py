@@ -0,0 +1,102 @@
+# .github/scripts/bench_rules.py
+# Micro-benchmark for achievement evaluation over synthetic accounts (no network involved).
+# Compares the original nested keyword x topic scan and min_* chain with the compiled rule table.
+#
+# Usage: python .github/scripts/bench_rules.py [--repos 10000] [--topics 50] [--repeat 3]
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import update_achievements as ua
+
+WORDS = ["api", "cli", "web", "bot", "game", "data", "ml", "docs", "tools", "infra", "react", "rust",
+         "security", "testing", "android", "ios", "design", "Discord", "Hacktoberfest", "TUI"]
+ENVIRONMENTAL_TOPICS = ["climate-tech", "green-energy", "reforestation", "EcoFriendly"]
+
+
+def make_repos(username, num_repos, topics_per_repo, seed=0):
+    rng = random.Random(seed)
+    repos = []
+    for i in range(num_repos):
+        owner = username if rng.random() < 0.9 else f"org-{i % 13}"
+        topics = [f"{rng.choice(WORDS)}-{rng.randint(0, 999)}" for _ in range(topics_per_repo)]
+        if topics and rng.random() < 0.05: # A few environmental repos, so most scans run to the end
+            topics[rng.randrange(len(topics))] = rng.choice(ENVIRONMENTAL_TOPICS)
+        repos.append({"name": f"repo-{i}", "owner": {"login": owner}, "fork": rng.random() < 0.1,
+                      "language": rng.choice(["Python", "Go", "Rust", "JavaScript", None]), "topics": topics})
+    return repos
+
+
+def legacy_unlocked_achievements(user_stats, repos_data, username):
+    """The evaluation loop as it was before the rule table, kept here as the benchmark baseline."""
+    environmental_keywords = ['eco', 'environment', 'climate', 'sustainability', 'green', 'conservation', 'reforestation']
+    environmental_repos_count = 0
+    unique_languages = set()
+    contributed_repos_count = 0
+    for repo in repos_data:
+        if repo['owner']['login'] == username:
+            repo_topics = repo['topics']
+            if any(keyword in topic.lower() for keyword in environmental_keywords for topic in repo_topics):
+                environmental_repos_count += 1
+            if repo['language']:
+                unique_languages.add(repo['language'].lower())
+        if repo['owner']['login'] != username and not repo['fork']:
+            contributed_repos_count += 1
+    unlocked_ids = set()
+    for achievement in ua.ACHIEVEMENTS:
+        is_unlocked = True
+        if "min_repos" in achievement and user_stats['total_repos'] < achievement["min_repos"]:
+            is_unlocked = False
+        if "min_commits" in achievement and user_stats['total_commits'] < achievement["min_commits"]:
+            is_unlocked = False
+        if "min_environmental_repos" in achievement and environmental_repos_count < achievement["min_environmental_repos"]:
+            is_unlocked = False
+        if "min_languages" in achievement and len(unique_languages) < achievement["min_languages"]:
+            is_unlocked = False
+        if "min_contributed_repos" in achievement and contributed_repos_count < achievement["min_contributed_repos"]:
+            is_unlocked = False
+        if is_unlocked:
+            unlocked_ids.add(achievement["id"])
+    return unlocked_ids, unique_languages
+
+
+def best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark achievement rule evaluation.")
+    parser.add_argument("--repos", type=int, default=10000)
+    parser.add_argument("--topics", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    username = "bench-user"
+    repos = make_repos(username, args.repos, args.topics)
+    user_stats = {"total_commits": 1234, "total_repos": args.repos}
+
+    legacy_time, legacy_result = best_of(args.repeat, lambda: legacy_unlocked_achievements(user_stats, repos, username))
+    compiled_time, compiled_result = best_of(args.repeat, lambda: ua.get_unlocked_achievements(user_stats, repos, username=username))
+    assert legacy_result == compiled_result, (legacy_result, compiled_result)
+
+    print(f"{args.repos} repos x {args.topics} topics (best of {args.repeat}):")
+    print(f"  legacy nested scan : {legacy_time * 1000:8.1f} ms")
+    print(f"  compiled rules     : {compiled_time * 1000:8.1f} ms  ({legacy_time / compiled_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
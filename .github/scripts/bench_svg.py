@@ -0,0 +1,76 @@
+# .github/scripts/bench_svg.py
+# Benchmarks skill-tree recolouring on a synthetic SVG with thousands of nodes, comparing the
+# original one-regex-per-skill rewrite with the single-pass recolor_skill_tree.
+#
+# Usage: python .github/scripts/bench_svg.py [--skills 2000 5000] [--repeat 3]
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import update_achievements as ua
+
+LANGUAGES = ["python", "javascript", "typescript", "go", "rust", "java", "c++", "html", "css", "ruby"]
+
+
+def make_skill_tree(num_skills, seed=0):
+    rng = random.Random(seed)
+    skills = []
+    nodes = []
+    for i in range(num_skills):
+        skill_id = f"skill-{i}"
+        skills.append({"id": skill_id, "keywords": rng.sample(LANGUAGES, 2) + [f"lib-{i}"],
+                       "color_active": "#4CAF50", "color_inactive": "#cccccc"})
+        nodes.append(f'  <circle id="{skill_id}" cx="{rng.randint(0, 999)}" cy="{rng.randint(0, 999)}" r="8" fill="#000000" />')
+        nodes.append(f'  <text x="{i}" y="{i}">{skill_id}</text>')
+    svg = '<svg xmlns="http://www.w3.org/2000/svg" width="1000" height="1000">\n' + "\n".join(nodes) + "\n</svg>"
+    return svg, {"skills": skills}
+
+
+def legacy_recolor(svg_content, skills_config, active_languages):
+    """The per-skill compile/search/sub loop as it was before the single-pass rewrite."""
+    updated_svg_content = svg_content
+    for skill_data in skills_config['skills']:
+        skill_id = skill_data['id']
+        keywords = [k.lower() for k in skill_data['keywords']]
+        is_skill_active = any(keyword in active_languages for keyword in keywords)
+        target_color = skill_data['color_active'] if is_skill_active else skill_data['color_inactive']
+        pattern_circle = re.compile(rf'(<circle[^>]*id="{re.escape(skill_id)}"[^>]*?)fill="[^"]*"([^>]*?>)')
+        if pattern_circle.search(updated_svg_content):
+            updated_svg_content = pattern_circle.sub(rf'\g<1>fill="{target_color}"\g<2>', updated_svg_content, 1)
+    return updated_svg_content
+
+
+def best_of(repeat, func):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark skill-tree SVG recolouring.")
+    parser.add_argument("--skills", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    active_languages = {"python", "rust"}
+    for num_skills in args.skills:
+        svg, skills_config = make_skill_tree(num_skills)
+        legacy_time, legacy_svg = best_of(args.repeat, lambda: legacy_recolor(svg, skills_config, active_languages))
+        single_time, (single_svg, _) = best_of(args.repeat, lambda: ua.recolor_skill_tree(svg, skills_config, active_languages))
+        assert legacy_svg == single_svg
+        print(f"{num_skills} skills, {len(svg) // 1024} KiB SVG: legacy {legacy_time * 1000:9.1f} ms, "
+              f"single pass {single_time * 1000:7.1f} ms ({legacy_time / single_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
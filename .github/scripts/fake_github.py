@@ -0,0 +1,408 @@
+# .github/scripts/fake_github.py
+# A small local stand-in for the parts of the GitHub REST API that update_achievements.py uses.
+# It serves synthetic (or recorded fixture) accounts from memory over REST and GraphQL and can
+# inject per-request latency, so the script can be benchmarked without touching (or being rate
+# limited by) the real API.
+#
+# Usage:
+#   python .github/scripts/fake_github.py --check (runs the script against injected faults and a tiny rate limit)
+#   python .github/scripts/fake_github.py --save account.json [--repos 200]
+#   python .github/scripts/fake_github.py --parity [--account account.json] (REST and GraphQL backends must agree)
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+LANGUAGES = ["Python", "JavaScript", "TypeScript", "Java", "C++", "Go", "Rust", "HTML", "CSS", None]
+TOPICS = ["eco", "climate", "react", "discord-bot", "cli", "api", "game", "accessibility", "lgbtq", "tools"]
+
+
+def make_account(username, num_repos, fork_ratio=0.1, external_ratio=0.0, crowded_ratio=0.0, seed=0):
+    """
+    Builds a synthetic account: user record, repo listing, contributors and topics per repo.
+    crowded_ratio is the fraction of repos with hundreds of contributors, where the user is far down the list.
+    """
+    rng = random.Random(seed)
+    repos = []
+    contributors = {}
+    topics = {}
+    for i in range(num_repos):
+        name = f"repo-{i:05d}"
+        owner = f"other-{i % 7}" if rng.random() < external_ratio else username
+        repos.append({
+            "id": i + 1,
+            "name": name,
+            "full_name": f"{owner}/{name}",
+            "owner": {"login": owner},
+            "fork": rng.random() < fork_ratio,
+            "language": rng.choice(LANGUAGES),
+            "pushed_at": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T00:00:00Z",
+        })
+        topics[f"{owner}/{name}"] = rng.sample(TOPICS, rng.randint(0, 4))
+        repos[-1]["topics"] = topics[f"{owner}/{name}"]
+        people = [{"login": username, "contributions": rng.randint(1, 400)}]
+        crowd = rng.randint(250, 400) if rng.random() < crowded_ratio else rng.randint(0, 3)
+        people += [{"login": f"friend-{j}", "contributions": rng.randint(1, 400)} for j in range(crowd)]
+        people.sort(key=lambda c: c["contributions"], reverse=True)
+        contributors[f"{owner}/{name}"] = people
+    user = {"login": username, "id": f"U_{username}", "public_repos": sum(1 for r in repos if r["owner"]["login"] == username)}
+    return {"user": user, "repos": repos, "contributors": contributors, "topics": topics}
+
+
+def save_account(account, path):
+    """Writes an account fixture as JSON so it can be replayed later."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(account, f)
+
+
+def expected_stats(account):
+    """The user stats update_achievements.py should report for an account: owned repos, and commits to the non-fork ones."""
+    username = account["user"]["login"]
+    owned = [r for r in account["repos"] if r["owner"]["login"] == username]
+    commits = 0
+    for repo in owned:
+        if not repo["fork"]:
+            people = account["contributors"].get(repo["full_name"], [])
+            commits += next((c["contributions"] for c in people if c["login"] == username), 0)
+    return {"total_commits": commits, "total_repos": len(owned)}
+
+
+def load_account(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128 # The default backlog of 5 drops connections under concurrent load
+
+
+class FakeGitHub:
+    """Threaded HTTP server answering /users and /repos requests from one or more in-memory accounts."""
+
+    def __init__(self, account, latency=0.0, rate_limit=5000, rate_window=3600.0, fault_rate=0.0, seed=0):
+        accounts = account if isinstance(account, list) else [account]
+        self.account = accounts[0]
+        self.accounts = {a["user"]["login"]: a for a in accounts}
+        self.contributors = {}
+        self.topics = {}
+        for a in accounts:
+            self.contributors.update(a["contributors"])
+            self.topics.update(a["topics"])
+        self.latency = latency
+        self.request_count = 0
+        self.not_modified_count = 0
+        self.bytes_sent = 0
+        # Primary rate limit: rate_limit requests per rate_window seconds, advertised in X-RateLimit-* headers
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.rate_remaining = rate_limit
+        self.rate_reset = time.time() + rate_window
+        # Contributor statistics answer 202 this many times per repo before the data is "computed"
+        self.stats_pending = 1
+        self._stats_polls = {}
+        # Fraction of requests answered with a transient 502 or a secondary-rate-limit 403
+        self.fault_rate = fault_rate
+        self.fault_count = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._server = _Server(("127.0.0.1", 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def route(self, path, query):
+        """Returns (status, payload) for a request path."""
+        parts = [p for p in path.split("/") if p]
+        if len(parts) in (2, 3) and parts[0] == "users" and parts[1] in self.accounts:
+            account = self.accounts[parts[1]]
+            if len(parts) == 2:
+                return 200, account["user"]
+            if parts[2] == "repos":
+                per_page = int(query.get("per_page", ["30"])[0])
+                page = int(query.get("page", ["1"])[0])
+                start = (page - 1) * per_page
+                return 200, account["repos"][start:start + per_page]
+        if len(parts) == 5 and parts[0] == "repos" and parts[3:] == ["stats", "contributors"]:
+            full_name = f"{parts[1]}/{parts[2]}"
+            if full_name not in self.contributors:
+                return 404, {"message": "Not Found"}
+            if not self.contributors[full_name]:
+                return 204, None # Empty repository
+            with self._lock:
+                polls = self._stats_polls[full_name] = self._stats_polls.get(full_name, 0) + 1
+            if polls <= self.stats_pending:
+                return 202, {}
+            # Like the real endpoint, only the top 100 contributors are included
+            top = self.contributors[full_name][:100]
+            return 200, [{"author": {"login": c["login"]}, "total": c["contributions"]} for c in top]
+        if parts == ["search", "commits"]:
+            terms = dict(term.split(":", 1) for term in query.get("q", [""])[0].split() if ":" in term)
+            people = self.contributors.get(terms.get("repo"), [])
+            total = next((c["contributions"] for c in people if c["login"] == terms.get("author")), 0)
+            return 200, {"total_count": total, "items": []}
+        if len(parts) == 4 and parts[0] == "repos":
+            full_name = f"{parts[1]}/{parts[2]}"
+            if parts[3] == "contributors" and full_name in self.contributors:
+                if not self.contributors[full_name]:
+                    return 204, None # Empty repository: no body at all
+                per_page = int(query.get("per_page", ["30"])[0])
+                page = int(query.get("page", ["1"])[0])
+                start = (page - 1) * per_page
+                return 200, self.contributors[full_name][start:start + per_page]
+            if parts[3] == "topics" and full_name in self.topics:
+                return 200, {"names": self.topics[full_name]}
+        return 404, {"message": "Not Found"}
+
+    def admit(self):
+        """Counts a request against the budget. Returns (status, payload, headers) for an injected failure, or None."""
+        with self._lock:
+            self.request_count += 1
+            now = time.time()
+            if now >= self.rate_reset:
+                self.rate_remaining = self.rate_limit
+                self.rate_reset = now + self.rate_window
+            headers = {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Reset": str(int(self.rate_reset)),
+            }
+            if self.rate_remaining <= 0:
+                headers["X-RateLimit-Remaining"] = "0"
+                return 403, {"message": "API rate limit exceeded"}, headers
+            if self.fault_rate and self._rng.random() < self.fault_rate:
+                self.fault_count += 1
+                headers["X-RateLimit-Remaining"] = str(self.rate_remaining)
+                if self._rng.random() < 0.5:
+                    return 502, {"message": "Server Error"}, headers
+                headers["Retry-After"] = "0"
+                return 403, {"message": "You have exceeded a secondary rate limit."}, headers
+            self.rate_remaining -= 1
+            headers["X-RateLimit-Remaining"] = str(self.rate_remaining)
+            return None, None, headers
+
+    def graphql(self, query, variables):
+        """Answers the two GraphQL queries update_achievements.py sends (user id, paged repositories)."""
+        login = variables.get("login")
+        account = self.accounts.get(login)
+        if account is None:
+            return 200, {"data": {"user": None}, "errors": [{"message": f"Could not resolve to a User with the login of '{login}'."}]}
+        if "repositories(" not in query:
+            return 200, {"data": {"user": {"id": account["user"]["id"]}}}
+
+        owned = [r for r in account["repos"] if r["owner"]["login"] == login]
+        start = int(variables.get("cursor") or 0)
+        page = owned[start:start + 100]
+        nodes = []
+        for repo in page:
+            people = self.contributors.get(repo["full_name"], [])
+            commits = next((c["contributions"] for c in people if c["login"] == login), 0)
+            nodes.append({
+                "name": repo["name"],
+                "isFork": repo["fork"],
+                "owner": {"login": repo["owner"]["login"]},
+                "primaryLanguage": {"name": repo["language"]} if repo["language"] else None,
+                "repositoryTopics": {"nodes": [{"topic": {"name": t}} for t in self.topics.get(repo["full_name"], [])]},
+                "defaultBranchRef": {"target": {"history": {"totalCount": commits}}} if people else None,
+            })
+        end = start + len(page)
+        page_info = {"hasNextPage": end < len(owned), "endCursor": str(end)}
+        return 200, {"data": {"user": {"repositories": {"pageInfo": page_info, "nodes": nodes}}}}
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, so connection pooling is measurable
+            wbufsize = -1 # Send headers and body in one write (avoids Nagle/delayed-ACK stalls)
+
+            def do_GET(self):
+                if fake.latency:
+                    time.sleep(fake.latency)
+                status, payload, rate_headers = fake.admit()
+                if status is not None:
+                    self._send_json(status, payload, rate_headers)
+                    return
+                split = urlsplit(self.path)
+                status, payload = fake.route(split.path, parse_qs(split.query))
+                if status == 200:
+                    # Weak ETag over the payload, honouring If-None-Match like the real API
+                    etag = 'W/"' + hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest() + '"'
+                    if self.headers.get("If-None-Match") == etag:
+                        with fake._lock:
+                            fake.not_modified_count += 1
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.send_header("Content-Length", "0")
+                        for name, value in rate_headers.items():
+                            self.send_header(name, value)
+                        self.end_headers()
+                        return
+                    self._send_json(status, payload, dict(rate_headers, ETag=etag))
+                    return
+                self._send_json(status, payload, rate_headers)
+
+            def do_POST(self):
+                if fake.latency:
+                    time.sleep(fake.latency)
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                status, payload, rate_headers = fake.admit()
+                if status is None:
+                    if urlsplit(self.path).path == "/graphql":
+                        status, payload = fake.graphql(request.get("query", ""), request.get("variables") or {})
+                    else:
+                        status, payload = 404, {"message": "Not Found"}
+                self._send_json(status, payload, rate_headers)
+
+            def _send_json(self, status, payload, headers=None):
+                body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                with fake._lock:
+                    fake.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def check_faults(username="fault-check", num_repos=40, fault_rate=0.2, rate_limit=30, rate_window=1.0):
+    """Fetches an account over REST through injected 502s, secondary rate limits and a tiny primary budget.
+
+    Checks the totals are exact and that the scheduler had to both retry and wait for the budget.
+    """
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import update_achievements
+    from rate_limit import RequestScheduler
+
+    account = make_account(username, num_repos)
+    api_url, scheduler = update_achievements.GITHUB_API_URL, update_achievements.scheduler
+    # Short backoff and enough retries that a run of faults on one request cannot exhaust them
+    update_achievements.scheduler = checked = RequestScheduler(max_retries=10, backoff_base=0.01, max_backoff=0.1)
+    try:
+        with FakeGitHub(account, rate_limit=rate_limit, rate_window=rate_window, fault_rate=fault_rate, seed=1) as fake:
+            update_achievements.GITHUB_API_URL = fake.url
+            user_stats, repos_data = update_achievements.fetch_github_data(username, None, backend="rest")
+    finally:
+        update_achievements.GITHUB_API_URL = api_url
+        update_achievements.scheduler = scheduler
+        update_achievements.close_session()
+
+    expected = expected_stats(account)
+    if user_stats != expected:
+        raise AssertionError(f"Stats under faults were {user_stats}, expected {expected}")
+    if len(repos_data) != len(account["repos"]):
+        raise AssertionError(f"Listed {len(repos_data)} repos, expected {len(account['repos'])}")
+    endpoints = checked.metrics()["endpoints"].values()
+    retries = sum(stats["retries"] for stats in endpoints)
+    paused = sum(stats["paused"] for stats in endpoints)
+    if not fake.fault_count or not retries:
+        raise AssertionError(f"Expected retries: {fake.fault_count} faults injected, {retries} retries")
+    if not paused:
+        raise AssertionError("Expected the scheduler to pause for the rate limit, but it never did")
+    return {"requests": fake.request_count, "faults": fake.fault_count, "retries": retries, "paused_s": paused}
+
+
+def _backend_view(user_stats, repos_data, username):
+    """What both backends report: the stats, and the owned repos (GraphQL does not list the others)."""
+    repos = sorted((repo['name'], repo['fork'], repo['language'], sorted(repo['topics'] or []))
+                   for repo in repos_data if repo['owner']['login'] == username)
+    return user_stats, repos
+
+
+def check_parity(path=None, num_repos=150):
+    """Serves a saved account fixture (a fresh synthetic one if path is None) and checks the REST and GraphQL backends agree."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import update_achievements
+
+    if path is None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "account.json")
+            save_account(make_account("parity-check", num_repos, external_ratio=0.2, seed=3), path)
+            account = load_account(path)
+    else:
+        account = load_account(path)
+    username = account["user"]["login"]
+    api_url = update_achievements.GITHUB_API_URL
+    views = {}
+    try:
+        with FakeGitHub(account) as fake:
+            fake.stats_pending = 0
+            update_achievements.GITHUB_API_URL = fake.url
+            for backend in ("rest", "graphql"):
+                user_stats, repos_data = update_achievements.fetch_github_data(username, "check-token", backend=backend)
+                views[backend] = _backend_view(user_stats, repos_data, username)
+    finally:
+        update_achievements.GITHUB_API_URL = api_url
+        update_achievements.close_session()
+
+    (rest_stats, rest_repos), (graphql_stats, graphql_repos) = views["rest"], views["graphql"]
+    if rest_stats != graphql_stats:
+        raise AssertionError(f"Backends disagree on stats: REST {rest_stats}, GraphQL {graphql_stats}")
+    if rest_repos != graphql_repos:
+        differing = sorted(set(map(repr, rest_repos)) ^ set(map(repr, graphql_repos)))
+        raise AssertionError(f"Backends disagree on {len(differing)} repo entries, e.g. {differing[:3]}")
+    return username, rest_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the GitHub API.")
+    parser.add_argument("--check", action="store_true", help="Fetch a fake account through injected faults and a small rate limit.")
+    parser.add_argument("--parity", action="store_true", help="Check the REST and GraphQL backends return the same data.")
+    parser.add_argument("--account", metavar="FILE", help="Account fixture for --parity (default: a synthetic one).")
+    parser.add_argument("--save", metavar="FILE", help="Write a synthetic account fixture.")
+    parser.add_argument("--repos", type=int, default=200, help="Repositories in the account written by --save.")
+    args = parser.parse_args()
+    if not (args.check or args.parity or args.save):
+        parser.print_help()
+        return
+    if args.save:
+        save_account(make_account(os.path.splitext(os.path.basename(args.save))[0], args.repos, external_ratio=0.2), args.save)
+        print(f"Wrote {args.save} ({args.repos} repos)")
+    if args.check:
+        result = check_faults()
+        print(f"Fault check OK ({result['requests']} requests, {result['faults']} faults, {result['retries']} retries, "
+              f"paused {result['paused_s']:.1f}s)")
+    if args.parity:
+        username, stats = check_parity(args.account)
+        print(f"Backend parity OK for {username} ({stats['total_repos']} repos, {stats['total_commits']} commits)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# .github/scripts/http_cache.py
+# On-disk cache of GitHub API responses keyed by URL, used for conditional requests.
+# Each entry keeps the ETag / Last-Modified validators and the already-decoded JSON body, so a
+# 304 Not Modified reply (which does not count against the rate limit) is served without
+# downloading or parsing the body again.
+
+import json
+import os
+import tempfile
+import threading
+
+CACHE_VERSION = 1
+
+
+class HttpCache:
+    """URL-keyed response cache persisted as one JSON file, evicting least recently used entries past max_bytes."""
+
+    def __init__(self, path, max_bytes=50 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.entries = {}
+        self.hits = 0 # Served from cache after a 304
+        self.misses = 0 # No usable entry, or the resource changed
+        self.evictions = 0
+        self._clock = 0 # Monotonic use counter for LRU ordering
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url, headers=None):
+        # Media type changes the representation (e.g. the topics preview), so it is part of the key
+        accept = (headers or {}).get('Accept', '')
+        return f"{url}|{accept}" if accept else url
+
+    def load(self):
+        """Loads the cache file if it exists. A missing, corrupt or outdated file just starts an empty cache."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return self
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Ignoring unreadable HTTP cache {self.path}: {e}")
+            return self
+        if stored.get('version') == CACHE_VERSION:
+            self.entries = stored.get('entries', {})
+            self._clock = max((entry.get('used', 0) for entry in self.entries.values()), default=0)
+        return self
+
+    def save(self):
+        """Writes the cache atomically (temp file + rename) after evicting down to max_bytes."""
+        with self._lock:
+            self._evict()
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".http_cache-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"version": CACHE_VERSION, "entries": self.entries}, f, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    def validators(self, key):
+        """Returns the conditional request headers for a cached entry (empty if there is none)."""
+        with self._lock:
+            entry = self.entries.get(key)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def hit(self, key):
+        """Records a 304 for key and returns the cached body."""
+        with self._lock:
+            entry = self.entries[key]
+            self._clock += 1
+            entry['used'] = self._clock
+            self.hits += 1
+            return entry['data']
+
+    def store(self, key, response, data):
+        """Stores a fresh 200 response if it carries a validator."""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        with self._lock:
+            self.misses += 1
+            if not etag and not last_modified:
+                self.entries.pop(key, None)
+                return
+            self._clock += 1
+            self.entries[key] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "data": data,
+                "size": len(response.content),
+                "used": self._clock,
+            }
+
+    def size(self):
+        return sum(entry.get('size', 0) for entry in self.entries.values())
+
+    def _evict(self):
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self.entries.items(), key=lambda item: item[1].get('used', 0)):
+            if total <= self.max_bytes:
+                break
+            total -= entry.get('size', 0)
+            del self.entries[key]
+            self.evictions += 1
+
+    def summary(self):
+        requests_seen = self.hits + self.misses
+        hit_rate = (100.0 * self.hits / requests_seen) if requests_seen else 0.0
+        return (f"HTTP cache: {self.hits} hits, {self.misses} misses ({hit_rate:.0f}% hit rate), "
+                f"{len(self.entries)} entries, {self.size() / 1024:.0f} KiB, {self.evictions} evicted")
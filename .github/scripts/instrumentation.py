@@ -0,0 +1,87 @@
+# .github/scripts/instrumentation.py
+# Lightweight timing spans and counters for update_achievements.py.
+# Spans record how often a phase ran and how long it took; counters track requests, bytes and
+# cache hits. The summary can be written as JSON or in the OpenMetrics text format so the
+# workflow can keep it as an artifact.
+
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Instrumentation:
+    """Thread-safe span timings and counters."""
+
+    def __init__(self):
+        self.spans = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self.spans.setdefault(name, {"count": 0, "total_s": 0.0, "max_s": 0.0})
+                stats['count'] += 1
+                stats['total_s'] += elapsed
+                stats['max_s'] = max(stats['max_s'], elapsed)
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self, **extra):
+        """Returns {"spans", "counters", **extra} as plain data."""
+        with self._lock:
+            data = {"spans": {name: dict(stats) for name, stats in sorted(self.spans.items())},
+                    "counters": dict(sorted(self.counters.items()))}
+        data.update(extra)
+        return data
+
+    def export(self, path, **extra):
+        """Writes the snapshot; a .prom/.txt path gets OpenMetrics text, anything else JSON."""
+        data = self.snapshot(**extra)
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith((".prom", ".txt")):
+                f.write(to_openmetrics(data))
+            else:
+                json.dump(data, f, indent=2)
+
+
+def _metric_name(name):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name).strip("_").lower()
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def to_openmetrics(data, prefix="achievements"):
+    """Renders a snapshot (spans, counters and optional per-endpoint API stats) as OpenMetrics text."""
+    lines = []
+    if data.get("spans"):
+        lines.append(f"# TYPE {prefix}_span_seconds summary")
+        for name, stats in data["spans"].items():
+            lines.append(f'{prefix}_span_seconds_count{{span="{_label(name)}"}} {stats["count"]}')
+            lines.append(f'{prefix}_span_seconds_sum{{span="{_label(name)}"}} {stats["total_s"]:.6f}')
+    for name, value in data.get("counters", {}).items():
+        metric = f"{prefix}_{_metric_name(name)}"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric}_total {value}")
+    endpoints = (data.get("api") or {}).get("endpoints", {})
+    if endpoints:
+        lines.append(f"# TYPE {prefix}_api_request_seconds summary")
+        for endpoint, stats in endpoints.items():
+            lines.append(f'{prefix}_api_request_seconds_count{{endpoint="{_label(endpoint)}"}} {stats["requests"]}')
+            lines.append(f'{prefix}_api_request_seconds_sum{{endpoint="{_label(endpoint)}"}} {stats["latency"]:.6f}')
+        lines.append(f"# TYPE {prefix}_api_retries counter")
+        for endpoint, stats in endpoints.items():
+            lines.append(f'{prefix}_api_retries_total{{endpoint="{_label(endpoint)}"}} {stats["retries"]}')
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
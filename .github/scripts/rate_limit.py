@@ -0,0 +1,187 @@
+# .github/scripts/rate_limit.py
+# Rate-limit-aware request scheduling for the GitHub API.
+# The scheduler reads X-RateLimit-Remaining / X-RateLimit-Reset from every reply and keeps one budget
+# per X-RateLimit-Resource (core, search, graphql, ...), since GitHub limits each separately. A
+# request slows down when its own resource's budget is nearly spent (and waits for the reset when
+# it is gone). Transient 5xx, 429 and secondary-rate-limit 403 replies are retried with jittered
+# exponential backoff. Per-endpoint latency and retry counters are kept so the run can report where
+# its time went.
+
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+RETRYABLE_STATUSES = {500, 502, 503, 504, 429}
+
+# /repos/{owner}/{repo}/... and /users/{user}/... collapse to one endpoint each for the counters
+_ENDPOINT_PATTERNS = [
+    (re.compile(r"^/repos/[^/]+/[^/]+"), "/repos/{owner}/{repo}"),
+    (re.compile(r"^/users/[^/]+"), "/users/{user}"),
+]
+
+
+def endpoint_name(method, url):
+    path = urlsplit(url).path
+    for pattern, replacement in _ENDPOINT_PATTERNS:
+        path = pattern.sub(replacement, path, count=1)
+    return f"{method} {path}"
+
+
+def resource_for(url):
+    """The rate-limit resource a request counts against, as reported in X-RateLimit-Resource."""
+    path = urlsplit(url).path
+    if path.startswith("/search/"):
+        return "search"
+    if path == "/graphql" or path.endswith("/graphql"):
+        return "graphql"
+    return "core"
+
+
+def parse_retry_after(value, now):
+    """Seconds to wait from a Retry-After header, which is either delay-seconds or an HTTP-date. None if it is neither."""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class RequestScheduler:
+    """Sends requests through a session while respecting GitHub's primary and secondary rate limits."""
+
+    def __init__(self, max_retries=4, backoff_base=1.0, max_backoff=60.0, reserve=20, max_wait=900.0,
+                 sleep=time.sleep, clock=time.time):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.reserve = reserve # Start pacing once this few requests are left in the window
+        self.max_wait = max_wait # Never sleep longer than this for a single pause
+        self.budgets = {} # resource -> [remaining, reset_at]
+        self.endpoints = {}
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self):
+        """Requests left in the core budget, or None before the first reply."""
+        return self.budgets.get("core", [None, None])[0]
+
+    @property
+    def reset_at(self):
+        return self.budgets.get("core", [None, None])[1]
+
+    # --- Pacing ---
+    def _pause_before_request(self, resource="core"):
+        with self._lock:
+            budget = self.budgets.get(resource)
+            if budget is None or budget[1] is None or budget[0] > self.reserve:
+                return 0.0
+            remaining, reset_at = budget
+            until_reset = max(0.0, reset_at - self._clock())
+            if remaining <= 0:
+                delay = until_reset + 1 # Budget gone: wait for the window to reset
+            else:
+                delay = until_reset / remaining # Spread what is left over the rest of the window
+                budget[0] -= 1 # Reserve our slot so concurrent callers pace too
+        return min(delay, self.max_wait)
+
+    def _observe(self, response, resource="core"):
+        """Updates the budget named by X-RateLimit-Resource (or, without it, the one the request was sent against)."""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining is None:
+            return
+        resource = response.headers.get('X-RateLimit-Resource', resource)
+        with self._lock:
+            budget = self.budgets.setdefault(resource, [None, None])
+            budget[0] = int(remaining)
+            if reset is not None:
+                budget[1] = float(reset)
+
+    # --- Retries ---
+    def _retry_delay(self, response, attempt):
+        """Returns seconds to wait before retrying, or None if the response should not be retried."""
+        if response is not None:
+            status = response.status_code
+            is_rate_limited = status == 403 and (
+                'Retry-After' in response.headers
+                or response.headers.get('X-RateLimit-Remaining') == '0'
+                or 'rate limit' in response.text.lower()
+            )
+            if status not in RETRYABLE_STATUSES and not is_rate_limited:
+                return None
+            retry_after = parse_retry_after(response.headers['Retry-After'], self._clock()) if 'Retry-After' in response.headers else None
+            if retry_after is not None: # An unparsable Retry-After falls through to jittered backoff
+                return min(retry_after, self.max_wait)
+            if response.headers.get('X-RateLimit-Remaining') == '0' and 'X-RateLimit-Reset' in response.headers:
+                return min(max(0.0, float(response.headers['X-RateLimit-Reset']) - self._clock()) + 1, self.max_wait)
+        # Full jitter: uniform in [0, base * 2^attempt], capped
+        return random.uniform(0, min(self.max_backoff, self.backoff_base * (2 ** attempt)))
+
+    def request(self, session, method, url, **kwargs):
+        """Performs the request with pacing and retries. Returns the final response (which may still be an error)."""
+        name = endpoint_name(method, url)
+        resource = resource_for(url)
+        attempt = 0
+        while True:
+            pause = self._pause_before_request(resource)
+            if pause > 0:
+                self._record(name, 'paused', pause)
+                self._sleep(pause)
+
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record(name, 'errors', 1)
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+            else:
+                self._record(name, 'latency', time.perf_counter() - start)
+                self._observe(response, resource)
+
+            delay = self._retry_delay(response, attempt) if attempt < self.max_retries else None
+            if delay is None:
+                return response
+            attempt += 1
+            self._record(name, 'retries', 1)
+            self._sleep(delay)
+
+    # --- Metrics ---
+    def _record(self, name, field, value):
+        with self._lock:
+            stats = self.endpoints.setdefault(name, {"requests": 0, "latency": 0.0, "max_latency": 0.0, "retries": 0, "errors": 0, "paused": 0.0})
+            if field == 'latency':
+                stats['requests'] += 1
+                stats['latency'] += value
+                stats['max_latency'] = max(stats['max_latency'], value)
+            else:
+                stats[field] += value
+
+    def metrics(self):
+        """Returns per-endpoint counters with mean latency, plus the last seen rate-limit budget."""
+        with self._lock:
+            endpoints = {}
+            for name, stats in sorted(self.endpoints.items()):
+                mean = stats['latency'] / stats['requests'] if stats['requests'] else 0.0
+                endpoints[name] = dict(stats, mean_latency=mean)
+            budgets = {resource: {"remaining": remaining, "reset": reset_at} for resource, (remaining, reset_at) in sorted(self.budgets.items())}
+            return {"rate_limit_remaining": self.remaining, "rate_limit_reset": self.reset_at, "rate_limits": budgets,
+                    "endpoints": endpoints}
+
+    def summary(self):
+        lines = [f"API requests (rate limit remaining: {self.remaining if self.remaining is not None else 'unknown'}):"]
+        for name, stats in self.metrics()['endpoints'].items():
+            lines.append(f"  {name}: {stats['requests']} requests, mean {stats['mean_latency'] * 1000:.0f} ms, "
+                         f"max {stats['max_latency'] * 1000:.0f} ms, {stats['retries']} retries, paused {stats['paused']:.1f}s")
+        return "\n".join(lines)
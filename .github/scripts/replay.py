@@ -0,0 +1,193 @@
+# .github/scripts/replay.py
+# Record / replay support for update_achievements.py.
+# A Recorder captures every API response the script receives into a gzipped JSON fixture archive
+# (set GITHUB_API_RECORD=path.json.gz). A ReplayServer serves such an archive on localhost with
+# configurable per-request latency, so runs can be reproduced and timed without the real API.
+#
+# Usage: python .github/scripts/replay.py --check   (records a GraphQL run against a fake API and replays it)
+
+import argparse
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+from fake_github import _Server
+
+ARCHIVE_VERSION = 1
+
+
+def request_key(method, url, accept=None, body=None):
+    """Archive key for a request: method, path and query (host stripped), Accept header and POST body.
+
+    POST requests are keyed by their body alone, and bodies are keyed as text whether they arrive
+    as bytes (requests) or str (the replay server), so recording and replay build the same key.
+    """
+    split = urlsplit(url)
+    key = f"{method} {split.path}" + (f"?{split.query}" if split.query else "")
+    if accept and method != "POST":
+        key += f" |{accept}"
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    if body:
+        key += f" |{body}"
+    return key
+
+
+class Recorder:
+    """Collects responses in memory and writes them as one fixture archive."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, status, body, content_type="application/json; charset=utf-8"):
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        with self._lock:
+            self.entries[key] = {"status": status, "content_type": content_type, "body": body}
+
+    def save(self):
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            json.dump({"version": ARCHIVE_VERSION, "entries": self.entries}, f)
+        return len(self.entries)
+
+
+def load_archive(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        archive = json.load(f)
+    if archive.get("version") != ARCHIVE_VERSION:
+        raise ValueError(f"Unsupported fixture archive version in {path}: {archive.get('version')}")
+    return archive["entries"]
+
+
+class ReplayServer:
+    """Threaded HTTP server answering requests from a fixture archive; unknown requests get a 404."""
+
+    def __init__(self, entries, latency=0.0):
+        self.entries = entries
+        self.latency = latency
+        self.request_count = 0
+        self.bytes_sent = 0
+        self.missing = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    @classmethod
+    def from_archive(cls, path, latency=0.0):
+        return cls(load_archive(path), latency)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._server = _Server(("127.0.0.1", 0), self._make_handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            with self._lock:
+                self.missing.append(key)
+        return entry
+
+    def _make_handler(self):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            wbufsize = -1
+
+            def do_GET(self):
+                self._answer(request_key("GET", self.path, self.headers.get("Accept")))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length).decode("utf-8")
+                self._answer(request_key("POST", self.path, None, body))
+
+            def _answer(self, key):
+                if replay.latency:
+                    time.sleep(replay.latency)
+                entry = replay.lookup(key)
+                if entry is None:
+                    entry = {"status": 404, "content_type": "application/json", "body": json.dumps({"message": "Not recorded"})}
+                body = entry["body"].encode("utf-8")
+                self.send_response(entry["status"])
+                self.send_header("Content-Type", entry["content_type"])
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with replay._lock:
+                    replay.request_count += 1
+                    replay.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def check_round_trip(username="replay-check"):
+    """Records GraphQL calls against a fake API, replays the archive and checks the same data comes back."""
+    import update_achievements
+    from fake_github import FakeGitHub, make_account
+
+    api_url = update_achievements.GITHUB_API_URL
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fixture.json.gz")
+        try:
+            with FakeGitHub(make_account(username, 5)) as fake:
+                update_achievements.GITHUB_API_URL = fake.url
+                update_achievements.enable_recorder(path)
+                try:
+                    recorded = update_achievements.get_graphql_data(username, None)
+                finally:
+                    update_achievements.disable_recorder()
+            with ReplayServer.from_archive(path) as replay:
+                update_achievements.GITHUB_API_URL = replay.url
+                replayed = update_achievements.get_graphql_data(username, None)
+        finally:
+            update_achievements.GITHUB_API_URL = api_url
+            update_achievements.close_session()
+    if replay.missing:
+        raise AssertionError(f"Requests missing from the archive: {replay.missing}")
+    if replayed != recorded:
+        raise AssertionError("Replayed GraphQL data differs from the recording")
+    return replay.request_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fixture archive tools for update_achievements.py.")
+    parser.add_argument("--check", action="store_true", help="Record a GraphQL run against a fake API and replay it.")
+    args = parser.parse_args()
+    if not args.check:
+        parser.print_help()
+        return
+    requests_replayed = check_round_trip()
+    print(f"Record/replay round trip OK ({requests_replayed} GraphQL requests replayed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# .github/scripts/repo_records.py
+# Compact decoding of /users/{user}/repos pages.
+# A full repository object carries ~80 fields (URLs, owner profile, license, permissions...), but
+# the achievement logic only reads a handful. Pages are decoded with an object_hook that turns each
+# repository into a RepoRecord as soon as its closing brace is parsed, so the nested owner/license
+# dicts and unused fields are discarded while the page is still being decoded.
+
+import json
+import sys
+
+
+class RepoRecord:
+    """The fields of a repository that update_achievements.py uses, with dict-style read access."""
+
+    __slots__ = ('name', 'full_name', 'owner', 'fork', 'language', 'topics', 'pushed_at')
+
+    def __init__(self, name, full_name, owner_login, fork, language, topics, pushed_at):
+        self.name = name
+        self.full_name = full_name
+        self.owner = _owner(owner_login)
+        self.fork = fork
+        self.language = language
+        self.topics = topics
+        self.pushed_at = pushed_at
+
+    # Callers index repos like the raw API dicts (repo['owner']['login'], repo.get('topics'))
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __repr__(self):
+        return f"RepoRecord({self.full_name!r})"
+
+    def to_dict(self):
+        return {"name": self.name, "full_name": self.full_name, "owner": {"login": self.owner['login']},
+                "fork": self.fork, "language": self.language, "topics": self.topics, "pushed_at": self.pushed_at}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['name'], data.get('full_name'), data['owner']['login'], data['fork'],
+                   data.get('language'), data.get('topics'), data.get('pushed_at'))
+
+
+# One shared {'login': ...} dict per owner instead of one per repository
+_owners = {}
+
+def _owner(login):
+    owner = _owners.get(login)
+    if owner is None:
+        owner = _owners.setdefault(login, {"login": sys.intern(login)})
+    return owner
+
+
+def _repo_hook(obj):
+    # Every JSON object passes through here, innermost first; only repository objects are kept
+    if 'full_name' in obj and 'owner' in obj and 'fork' in obj:
+        language = obj.get('language')
+        topics = obj.get('topics')
+        return RepoRecord(obj['name'], obj['full_name'], obj['owner']['login'], obj['fork'],
+                          sys.intern(language) if language else language,
+                          [sys.intern(topic) for topic in topics] if topics is not None else None,
+                          obj.get('pushed_at'))
+    return obj
+
+
+def decode_repo_page(content):
+    """Decodes one repository listing page (bytes or str) into a list of RepoRecords."""
+    return json.loads(content, object_hook=_repo_hook)
+
+
+class RepoPageDecoder:
+    """Plugs compact decoding into github_api_request, with a JSON-safe form for the HTTP cache."""
+
+    @staticmethod
+    def decode(content):
+        return decode_repo_page(content)
+
+    @staticmethod
+    def to_cached(records):
+        return [record.to_dict() for record in records]
+
+    @staticmethod
+    def from_cached(data):
+        return [RepoRecord.from_dict(item) for item in data]
@@ -0,0 +1,91 @@
+# .github/scripts/repo_state.py
+# Per-repository results persisted between runs, keyed by full repo name and watermarked by pushed_at.
+# A repo whose pushed_at has not moved since the last run can reuse its stored contribution count
+# and topics instead of asking the API again.
+
+import json
+import os
+import tempfile
+import threading
+
+STATE_VERSION = 2 # 2: contributions are exact counts (version 1 only sampled the top contributor)
+
+
+class RepoState:
+    """Stored per-repo records ({pushed_at, contributions, topics, language, ...}) for one user."""
+
+    def __init__(self, path, username):
+        self.path = path
+        self.username = username
+        self.repos = {}
+        self.reused = 0
+        self.refreshed = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def repo_key(repo):
+        return repo.get('full_name') or f"{repo['owner']['login']}/{repo['name']}"
+
+    def load(self):
+        """Loads the state file. A missing or unreadable file, or one written for another user, starts empty."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return self
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Ignoring unreadable state file {self.path}: {e}")
+            return self
+        if stored.get('version') == STATE_VERSION and stored.get('username') == self.username:
+            self.repos = stored.get('repos', {})
+        return self
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".repo_state-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": STATE_VERSION, "username": self.username, "repos": self.repos}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def cached(self, repo, field):
+        """Returns the stored value of field if the repo has not been pushed since it was recorded, else None."""
+        with self._lock:
+            record = self.repos.get(self.repo_key(repo))
+            if record is None or repo.get('pushed_at') is None or field not in record or record.get('pushed_at') != repo.get('pushed_at'):
+                return None
+            self.reused += 1
+            return record[field]
+
+    def last_value(self, repo, field):
+        """Returns the stored value of field even if the repo has been pushed since (e.g. which source worked before)."""
+        with self._lock:
+            return self.repos.get(self.repo_key(repo), {}).get(field)
+
+    def update(self, repo, **fields):
+        """Stores fresh values for a repo, resetting its record if pushed_at moved."""
+        key = self.repo_key(repo)
+        with self._lock:
+            record = self.repos.get(key)
+            if record is None or record.get('pushed_at') != repo.get('pushed_at'):
+                kept = {"commit_source": record['commit_source']} if record and 'commit_source' in record else {}
+                record = dict(kept, pushed_at=repo.get('pushed_at'))
+                self.repos[key] = record
+            record.update(fields)
+            record['language'] = repo.get('language')
+            record['fork'] = repo.get('fork')
+            self.refreshed += 1
+
+    def prune(self, repos_data):
+        """Drops records for repositories that are no longer in the listing."""
+        current = {self.repo_key(repo) for repo in repos_data}
+        with self._lock:
+            for key in [key for key in self.repos if key not in current]:
+                del self.repos[key]
+
+    def summary(self):
+        return f"Repo state: {len(self.repos)} repos tracked, {self.reused} values reused, {self.refreshed} refreshed"
@@ -2,17 +2,57 @@
 # This script fetches GitHub stats and updates the README with achievements and dynamic skill tree colors.
 
 import os
+import argparse
+import hashlib
+import tempfile
 import requests
 import re
 import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from http_cache import HttpCache
+from instrumentation import Instrumentation
+from rate_limit import RequestScheduler
+from repo_records import RepoPageDecoder
+from repo_state import RepoState
+from replay import Recorder, request_key
 
 # --- Configuration ---
 GITHUB_USERNAME = os.getenv('GITHUB_USERNAME')
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
+GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+# Maximum number of API requests in flight at once (also the size of the connection pool)
+GITHUB_API_CONCURRENCY = int(os.getenv('GITHUB_API_CONCURRENCY', '8'))
+GITHUB_API_TIMEOUT = 30 # Seconds
+GITHUB_API_MAX_RETRIES = int(os.getenv('GITHUB_API_MAX_RETRIES', '4'))
+# Optional path for the run's metrics summary: spans, counters and per-endpoint API stats
+# (OpenMetrics text for .prom/.txt paths, JSON otherwise)
+GITHUB_API_METRICS = os.getenv('GITHUB_API_METRICS', '')
+# DEBUG shows per-section and per-skill detail; the default keeps the hot paths quiet
+ACHIEVEMENTS_LOG_LEVEL = os.getenv('ACHIEVEMENTS_LOG_LEVEL', 'INFO').upper()
+# Optional path for a JSON report of how each repo's commit count was obtained ('{username}' is substituted;
+# batch runs without it write one report per user next to the path)
+GITHUB_COMMIT_COST_REPORT = os.getenv('GITHUB_COMMIT_COST_REPORT', '')
+# Optional path of a gzipped fixture archive that captures every API response for offline replay
+GITHUB_API_RECORD = os.getenv('GITHUB_API_RECORD', '')
+# Where stats come from: 'rest' (one call per repo) or 'graphql' (a few batched queries, needs a token)
+GITHUB_DATA_BACKEND = os.getenv('GITHUB_DATA_BACKEND', 'rest').lower()
+DATA_BACKENDS = ('rest', 'graphql')
+# Conditional-request cache kept between runs (set GITHUB_HTTP_CACHE to an empty string to disable)
+GITHUB_HTTP_CACHE = os.getenv('GITHUB_HTTP_CACHE', '.cache/github_http_cache.json')
+GITHUB_HTTP_CACHE_MAX_BYTES = int(os.getenv('GITHUB_HTTP_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+# Per-repo results keyed by pushed_at, so unchanged repos are not re-fetched (empty string disables)
+GITHUB_STATE_FILE = os.getenv('GITHUB_STATE_FILE', '.cache/achievements_state.json')
 
 # Base URL for achievement images (YOU MUST CREATE THESE IMAGES AND UPLOAD THEM TO A REPO)
 # Example: https://github.com/YOUR_USERNAME/your-images-repo/raw/main/
-ACHIEVEMENT_IMAGE_BASE_URL = f"https://github.com/{GITHUB_USERNAME}/your-profile-images-repo/raw/main/" # REMEMBER TO REPLACE 'your-profile-images-repo'
+def achievement_image_base_url(username):
+    return f"https://github.com/{username}/your-profile-images-repo/raw/main/" # REMEMBER TO REPLACE 'your-profile-images-repo'
+
+ACHIEVEMENT_IMAGE_BASE_URL = achievement_image_base_url(GITHUB_USERNAME)
 
 # Define your achievement criteria and messages with image IDs
 ACHIEVEMENTS = [
@@ -26,91 +66,487 @@ ACHIEVEMENTS = [
     {"id": "thousand_commits_explorer", "min_commits": 1000, "message": "🎉 **Thousand Commits Explorer:** Surpassed 1,000 commits!", "img_locked": "achievement_thousand_commits_explorer_locked.png", "img_unlocked": "achievement_thousand_commits_explorer_unlocked.png"},
 ]
 
+log = logging.getLogger("update_achievements")
+instrumentation = Instrumentation()
+
 # --- GitHub API Helpers ---
-def github_api_request(url, token, headers=None):
-    """Helper for making GitHub API requests."""
+_session = None
+_session_lock = threading.Lock()
+_http_cache = None # HttpCache, set by enable_http_cache()
+scheduler = RequestScheduler(max_retries=GITHUB_API_MAX_RETRIES)
+# In-process response memo shared by every profile in a batch run, so shared repos are fetched once
+_response_memo = None
+_response_memo_lock = threading.Lock()
+_recorder = None # Recorder, set by enable_recorder()
+
+def get_session():
+    """Returns the shared keep-alive session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(1, GITHUB_API_CONCURRENCY))
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+def close_session():
+    """Closes the shared session so the next request opens a fresh pool."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def enable_http_cache(path, max_bytes=GITHUB_HTTP_CACHE_MAX_BYTES):
+    """Loads the on-disk HTTP cache; later GET requests are sent as conditional requests."""
+    global _http_cache
+    _http_cache = HttpCache(path, max_bytes).load()
+    return _http_cache
+
+def disable_http_cache():
+    """Saves and detaches the HTTP cache. Returns it so the caller can report its summary."""
+    global _http_cache
+    cache, _http_cache = _http_cache, None
+    if cache is not None:
+        cache.save()
+    return cache
+
+def enable_recorder(path):
+    global _recorder
+    _recorder = Recorder(path)
+    return _recorder
+
+def disable_recorder():
+    """Writes and detaches the recorder. Returns it (or None) so the caller can report what was saved."""
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is not None:
+        recorder.save()
+    return recorder
+
+def _record_response(response, data=None):
+    request = response.request
+    key = request_key(request.method, request.url, request.headers.get('Accept'), request.body)
+    if data is not None: # Served from the HTTP cache after a 304: record what the script actually used
+        _recorder.record(key, 200, json.dumps(data))
+    else:
+        _recorder.record(key, response.status_code, response.content, response.headers.get('Content-Type', 'application/json'))
+
+def enable_response_memo():
+    global _response_memo
+    _response_memo = {}
+
+def disable_response_memo():
+    global _response_memo
+    _response_memo = None
+
+def github_api_request(url, token, headers=None, decoder=None):
+    """
+    Helper for making GitHub API requests.
+    decoder (e.g. RepoPageDecoder) replaces response.json() with a custom decode of the body,
+    and converts to and from a JSON-safe form for the HTTP cache.
+    """
+    memo = _response_memo
+    if memo is not None:
+        memo_key = HttpCache.key(url, headers)
+        with _response_memo_lock:
+            if memo_key in memo:
+                instrumentation.incr("memo_hits")
+                return memo[memo_key]
+        data = _github_api_get(url, token, headers, decoder)
+        with _response_memo_lock:
+            memo[memo_key] = data
+        return data
+    return _github_api_get(url, token, headers, decoder)
+
+def _github_api_get(url, token, headers=None, decoder=None):
     default_headers = {}
     if token:
         default_headers['Authorization'] = f'token {token}'
     if headers:
         default_headers.update(headers)
-    
-    response = requests.get(url, headers=default_headers)
-    response.raise_for_status()
-    return response.json()
 
-def get_user_stats(username, token):
-    """Fetches user's total commits and public repository count."""
+    cache = _http_cache
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.key(url, headers)
+        default_headers.update(cache.validators(cache_key))
     
-    # Get total public repositories
-    user_data = github_api_request(f"https://api.github.com/users/{username}", token)
-    total_repos = user_data.get('public_repos', 0)
-
-    # Get total commits (approximated for public repos owned by user)
-    total_commits = 0
-    page = 1
-    while True:
-        repos = github_api_request(f"https://api.github.com/users/{username}/repos?per_page=100&page={page}", token)
-        if not repos:
-            break
-        
-        for repo in repos:
-            if not repo['fork']: # Only count commits to original repos, not forks
-                try:
-                    contributors = github_api_request(f"https://api.github.com/repos/{username}/{repo['name']}/contributors?per_page=1", token)
-                    for contributor in contributors:
-                        if contributor['login'] == username:
-                            total_commits += contributor['contributions']
-                            break
-                except requests.exceptions.RequestException as e:
-                    print(f"Warning: Could not fetch contributors for {repo['name']}: {e}")
-        page += 1
+    response = scheduler.request(get_session(), 'GET', url, headers=default_headers, timeout=GITHUB_API_TIMEOUT)
+    instrumentation.incr("api_requests")
+    instrumentation.incr("api_bytes", len(response.content))
+    if cache is not None and response.status_code == 304:
+        instrumentation.incr("http_cache_hits")
+        data = cache.hit(cache_key)
+        if _recorder is not None:
+            _record_response(response, data)
+        return decoder.from_cached(data) if decoder else data
+    if _recorder is not None:
+        _record_response(response)
+    response.raise_for_status()
+    # Only a 200 is the finished resource; e.g. a 202 from the statistics endpoint is an empty placeholder
+    store = cache is not None and response.status_code == 200
+    if decoder is None:
+        data = response.json() if response.content else None # 204 No Content (e.g. an empty repository)
+        if store:
+            cache.store(cache_key, response, data)
+        return data
+    data = decoder.decode(response.content)
+    if store:
+        cache.store(cache_key, response, decoder.to_cached(data))
+    return data
+
+def run_concurrently(func, items):
+    """Calls func on every item using up to GITHUB_API_CONCURRENCY threads. Results keep the input order."""
+    items = list(items)
+    workers = max(1, min(GITHUB_API_CONCURRENCY, len(items)))
+    if workers == 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items))
+
+def get_user_stats(username, token, repos_data=None, state=None, cost_report=None):
+    """
+    Fetches user's total commits and public repository count.
+    Pass the snapshot from get_all_repo_data to avoid paging the repository list again, and a
+    RepoState to reuse the counts of repos that have not been pushed since the last run.
+    If cost_report is a dict it is filled with {repo_name: {"source", "requests", "commits"}}.
+    """
+    if repos_data is None:
+        repos_data = get_all_repo_data(username, token)
+
+    # The repo listing only contains public repositories, so the owned ones are the public repo count
+    owned_repos = [repo for repo in repos_data if repo['owner']['login'] == username]
+    total_repos = len(owned_repos)
+
+    # Get total commits for public repos owned by user
+    original_repos = [repo for repo in owned_repos if not repo['fork']] # Only count commits to original repos, not forks
+    report_lock = threading.Lock()
+
+    def repo_commits(repo):
+        preferred_source = None
+        if state is not None:
+            cached = state.cached(repo, 'contributions')
+            if cached is not None:
+                if cost_report is not None:
+                    with report_lock:
+                        cost_report[repo['name']] = {"source": "state", "requests": 0, "commits": cached}
+                return cached
+            preferred_source = state.last_value(repo, 'commit_source')
+        count, source, request_count = get_repo_commit_count(username, repo['name'], token, preferred_source)
+        if cost_report is not None:
+            with report_lock:
+                cost_report[repo['name']] = {"source": source, "requests": request_count, "commits": count}
+        if count is None:
+            return 0
+        if state is not None:
+            state.update(repo, contributions=count, commit_source=source)
+        return count
+
+    # Commit lookups are independent, so fan them out over the shared connection pool
+    commit_counts = run_concurrently(repo_commits, original_repos)
+    total_commits = sum(commit_counts)
     
     return total_commits, total_repos
 
+# --- Commit Counting ---
+# Sources in order of cost: the contributors list (usually one request), the contributor
+# statistics endpoint (one request, but may answer 202 while GitHub computes it), and the commit
+# search count (accurate, but the search API only allows 30 requests a minute).
+COMMIT_SOURCES = ('contributors', 'stats', 'search')
+CONTRIBUTOR_PAGES_LIMIT = 3 # Pages of 100 to read before trying the next source
+STATS_POLL_ATTEMPTS = 4
+STATS_POLL_DELAY = 1.0 # Seconds, doubled after every 202
+
+def count_commits_from_contributors(username, repo_name, token, counter):
+    """Pages through the contributors list until the user is found. Returns None if they are not in the first pages."""
+    for page in range(1, CONTRIBUTOR_PAGES_LIMIT + 1):
+        counter[0] += 1
+        contributors = github_api_request(f"{GITHUB_API_URL}/repos/{username}/{repo_name}/contributors?per_page=100&page={page}", token)
+        if not contributors:
+            return 0 # An empty repository answers 204 with no body: nobody has commits
+        for contributor in contributors:
+            if contributor.get('login') == username:
+                return contributor['contributions']
+        if len(contributors) < 100:
+            return 0 # Listed every contributor and the user is not among them
+    return None
+
+def count_commits_from_stats(username, repo_name, token, counter):
+    """Reads the contributor statistics, polling while GitHub answers 202 (still computing). None if it never finishes."""
+    delay = STATS_POLL_DELAY
+    for attempt in range(STATS_POLL_ATTEMPTS):
+        counter[0] += 1
+        # Not memoised: a 202 placeholder must not be served again to later callers
+        stats = _github_api_get(f"{GITHUB_API_URL}/repos/{username}/{repo_name}/stats/contributors", token)
+        if stats is None: # 204: the repository is empty
+            return 0
+        if isinstance(stats, list):
+            for entry in stats:
+                if (entry.get('author') or {}).get('login') == username:
+                    return entry['total']
+            # Only the top 100 contributors are listed, so absence from a full list proves nothing
+            return 0 if len(stats) < 100 else None
+        if attempt < STATS_POLL_ATTEMPTS - 1:
+            time.sleep(delay)
+            delay *= 2
+    return None
+
+def count_commits_from_search(username, repo_name, token, counter):
+    counter[0] += 1
+    result = github_api_request(f"{GITHUB_API_URL}/search/commits?q=author:{username}+repo:{username}/{repo_name}&per_page=1", token)
+    return (result or {}).get('total_count', 0)
+
+COMMIT_COUNTERS = {
+    'contributors': count_commits_from_contributors,
+    'stats': count_commits_from_stats,
+    'search': count_commits_from_search,
+}
+
+def get_repo_commit_count(username, repo_name, token, preferred_source=None):
+    """
+    Returns (commits, source, requests) for one of the user's repositories, trying the cheapest
+    accurate source first (or the one that worked last time). commits is None if every source failed.
+    """
+    sources = list(COMMIT_SOURCES)
+    if preferred_source in sources:
+        sources.remove(preferred_source)
+        sources.insert(0, preferred_source)
+
+    counter = [0]
+    for source in sources:
+        try:
+            count = COMMIT_COUNTERS[source](username, repo_name, token, counter)
+        except requests.exceptions.RequestException as e:
+            print(f"Warning: Could not count commits for {repo_name} via {source}: {e}")
+            continue
+        if count is not None:
+            return count, source, counter[0]
+    return None, None, counter[0]
+
+def summarize_commit_costs(cost_report):
+    by_source = {}
+    for entry in cost_report.values():
+        totals = by_source.setdefault(entry['source'] or 'failed', [0, 0])
+        totals[0] += 1
+        totals[1] += entry['requests']
+    parts = [f"{source}: {repos} repos / {requests_made} requests" for source, (repos, requests_made) in sorted(by_source.items())]
+    return "Commit counts by source: " + (", ".join(parts) if parts else "none")
+
 def get_repo_topics(owner, repo_name, token):
     """Fetches topics (tags) for a specific repository."""
     headers = {'Accept': 'application/vnd.github.mercy-preview+json'} # Required for topics API
     try:
-        data = github_api_request(f"https://api.github.com/repos/{owner}/{repo_name}/topics", token, headers=headers)
-        return data.get('names', [])
+        data = github_api_request(f"{GITHUB_API_URL}/repos/{owner}/{repo_name}/topics", token, headers=headers)
+        return (data or {}).get('names', [])
     except requests.exceptions.RequestException as e:
         print(f"Warning: Could not fetch topics for {owner}/{repo_name}: {e}")
         return []
 
 def get_all_repo_data(username, token):
-    """Fetches data for all user's public repositories."""
+    """
+    Fetches data for all user's public repositories. The result is the single repository snapshot for the run.
+    Pages are decoded straight into compact RepoRecords holding only the fields the script reads.
+    """
     repos_data = []
     page = 1
     while True:
-        repos = github_api_request(f"https://api.github.com/users/{username}/repos?per_page=100&page={page}", token)
-        if not repos:
-            break
+        repos = github_api_request(f"{GITHUB_API_URL}/users/{username}/repos?per_page=100&page={page}", token,
+                                   decoder=RepoPageDecoder)
         repos_data.extend(repos)
+        if len(repos) < 100: # A short page is the last one; no need to ask for an empty page after it
+            break
         page += 1
     return repos_data
 
+# --- GraphQL Backend ---
+GRAPHQL_USER_ID_QUERY = """
+query($login: String!) {
+  user(login: $login) { id }
+}
+"""
+
+GRAPHQL_REPOS_QUERY = """
+query($login: String!, $authorId: ID!, $cursor: String) {
+  user(login: $login) {
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER, privacy: PUBLIC) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        isFork
+        owner { login }
+        primaryLanguage { name }
+        repositoryTopics(first: 20) { nodes { topic { name } } }
+        defaultBranchRef {
+          target { ... on Commit { history(author: {id: $authorId}) { totalCount } } }
+        }
+      }
+    }
+  }
+}
+"""
+
+def github_graphql_request(query, variables, token):
+    """Helper for making GitHub GraphQL API requests. Returns the 'data' member of the response."""
+    headers = {'Authorization': f'bearer {token}'} if token else {}
+    response = scheduler.request(get_session(), 'POST', f"{GITHUB_API_URL}/graphql", json={"query": query, "variables": variables},
+                                 headers=headers, timeout=GITHUB_API_TIMEOUT)
+    instrumentation.incr("api_requests")
+    instrumentation.incr("api_bytes", len(response.content))
+    if _recorder is not None:
+        _record_response(response)
+    response.raise_for_status()
+    payload = response.json()
+    if payload.get('errors'):
+        messages = "; ".join(error.get('message', str(error)) for error in payload['errors'])
+        raise requests.exceptions.HTTPError(f"GraphQL query failed: {messages}", response=response)
+    return payload['data']
+
+def get_graphql_data(username, token):
+    """
+    Fetches repositories, topics, primary languages and commit totals in a few paginated GraphQL queries.
+    Returns (user_stats, repos_data) in the same shapes the REST backend produces.
+    """
+    user = github_graphql_request(GRAPHQL_USER_ID_QUERY, {"login": username}, token)['user']
+    if not user:
+        raise requests.exceptions.HTTPError(f"GraphQL query failed: user '{username}' not found")
+
+    repos_data = []
+    total_commits = 0
+    cursor = None
+    while True:
+        variables = {"login": username, "authorId": user['id'], "cursor": cursor}
+        repositories = github_graphql_request(GRAPHQL_REPOS_QUERY, variables, token)['user']['repositories']
+        for node in repositories['nodes']:
+            repos_data.append({
+                "name": node['name'],
+                "fork": node['isFork'],
+                "owner": {"login": node['owner']['login']},
+                "language": (node.get('primaryLanguage') or {}).get('name'),
+                "topics": [t['topic']['name'] for t in node['repositoryTopics']['nodes']],
+            })
+            # Empty repositories have no default branch; forks are skipped like in the REST backend
+            target = (node.get('defaultBranchRef') or {}).get('target') or {}
+            if not node['isFork'] and 'history' in target:
+                total_commits += target['history']['totalCount']
+        if not repositories['pageInfo']['hasNextPage']:
+            break
+        cursor = repositories['pageInfo']['endCursor']
+
+    total_repos = sum(1 for repo in repos_data if repo['owner']['login'] == username)
+    return {"total_commits": total_commits, "total_repos": total_repos}, repos_data
+
+def fetch_github_data(username, token, backend=None, state=None, cost_report=None):
+    """Returns (user_stats, repos_data) using the selected data backend. state and cost_report only apply to REST."""
+    backend = (backend or GITHUB_DATA_BACKEND).lower()
+    if backend not in DATA_BACKENDS:
+        raise ValueError(f"Unknown data backend '{backend}'. Choose one of: {', '.join(DATA_BACKENDS)}.")
+    if backend == 'graphql':
+        if token:
+            return get_graphql_data(username, token)
+        print("Warning: The GraphQL backend needs GITHUB_TOKEN. Falling back to the REST backend.")
+
+    # Page through the repository list once; stats and achievements both work from this snapshot
+    repos_data = get_all_repo_data(username, token)
+    total_commits, total_repos = get_user_stats(username, token, repos_data, state, cost_report)
+    return {"total_commits": total_commits, "total_repos": total_repos}, repos_data
+
 # --- Achievement Logic ---
-def get_unlocked_achievements(user_stats, repos_data):
-    """Checks which achievements are unlocked based on user stats and repo data."""
+ENVIRONMENTAL_KEYWORDS = ['eco', 'environment', 'climate', 'sustainability', 'green', 'conservation', 'reforestation']
+# One alternation over all keywords; a repo matches if any keyword is a substring of any topic
+ENVIRONMENTAL_TOPIC_PATTERN = re.compile("|".join(re.escape(keyword) for keyword in ENVIRONMENTAL_KEYWORDS))
+
+# Metric name -> function(context) -> number. An achievement's "min_<name>" key is checked against metric <name>.
+ACHIEVEMENT_METRICS = {}
+
+def register_metric(name):
+    """Decorator that makes a metric available to achievements as "min_<name>"."""
+    def decorator(func):
+        ACHIEVEMENT_METRICS[name] = func
+        return func
+    return decorator
+
+@register_metric("repos")
+def _metric_repos(context):
+    return context['user_stats']['total_repos']
+
+@register_metric("commits")
+def _metric_commits(context):
+    return context['user_stats']['total_commits']
+
+@register_metric("environmental_repos")
+def _metric_environmental_repos(context):
+    return context['environmental_repos']
+
+@register_metric("languages")
+def _metric_languages(context):
+    return len(context['languages'])
+
+@register_metric("contributed_repos")
+def _metric_contributed_repos(context):
+    return context['contributed_repos']
+
+def compile_achievement_rules(achievements):
+    """Turns achievement definitions into (id, [(metric, threshold), ...]) rows, validated once."""
+    rules = []
+    for achievement in achievements:
+        conditions = []
+        for key, threshold in achievement.items():
+            if not key.startswith("min_"):
+                continue
+            metric = key[len("min_"):]
+            if metric not in ACHIEVEMENT_METRICS:
+                raise ValueError(f"Achievement '{achievement['id']}' uses unknown metric '{metric}'.")
+            conditions.append((metric, threshold))
+        rules.append((achievement["id"], conditions))
+    return rules
+
+_achievement_rules = None
+
+def get_achievement_rules():
+    global _achievement_rules
+    if _achievement_rules is None:
+        _achievement_rules = compile_achievement_rules(ACHIEVEMENTS)
+    return _achievement_rules
+
+def evaluate_achievement_rules(rules, context):
+    """Returns the ids of the rules whose conditions all hold. Each metric is computed at most once."""
+    values = {}
     unlocked_ids = set()
-    
-    total_commits = user_stats['total_commits']
-    total_repos = user_stats['total_repos']
+    for achievement_id, conditions in rules:
+        for metric, threshold in conditions:
+            if metric not in values:
+                values[metric] = ACHIEVEMENT_METRICS[metric](context)
+            if values[metric] < threshold:
+                break
+        else:
+            unlocked_ids.add(achievement_id)
+    return unlocked_ids
+
+def is_environmental(topics):
+    return bool(topics) and ENVIRONMENTAL_TOPIC_PATTERN.search("\n".join(topics).lower()) is not None
+
+def get_unlocked_achievements(user_stats, repos_data, state=None, username=None, token=GITHUB_TOKEN):
+    """Checks which achievements are unlocked based on user stats and repo data."""
+    username = username or GITHUB_USERNAME
 
-    # Environmental repos count
-    environmental_keywords = ['eco', 'environment', 'climate', 'sustainability', 'green', 'conservation', 'reforestation']
     environmental_repos_count = 0
-    
-    # Languages count & contributed repos count
     unique_languages = set()
     contributed_repos_count = 0 # Repos where user is contributor but not owner
     
     for repo in repos_data:
         # Check for environmental repos owned by user
-        if repo['owner']['login'] == GITHUB_USERNAME:
-            repo_topics = get_repo_topics(GITHUB_USERNAME, repo['name'], GITHUB_TOKEN)
-            if any(keyword in topic.lower() for keyword in environmental_keywords for topic in repo_topics):
+        if repo['owner']['login'] == username:
+            # The repo listing already carries topics; only older API responses without them need a separate call
+            repo_topics = repo.get('topics')
+            if repo_topics is None and state is not None:
+                repo_topics = state.cached(repo, 'topics')
+            if repo_topics is None:
+                repo_topics = get_repo_topics(username, repo['name'], token)
+                if state is not None:
+                    state.update(repo, topics=repo_topics)
+            if is_environmental(repo_topics):
                 environmental_repos_count += 1
             
             # Collect languages for owned repos
@@ -118,144 +554,297 @@ def get_unlocked_achievements(user_stats, repos_data):
                 unique_languages.add(repo['language'].lower()) # Convert to lower case for consistency
 
         # Check for contributions to other repos (not owned by user, not forks of user's repos)
-        if repo['owner']['login'] != GITHUB_USERNAME and not repo['fork']:
+        elif not repo['fork']:
             contributed_repos_count += 1 
 
-    num_unique_languages = len(unique_languages)
-
-    print(f"Calculated: Env Repos: {environmental_repos_count}, Unique Languages: {num_unique_languages}, Contributed Repos: {contributed_repos_count}")
+    print(f"Calculated: Env Repos: {environmental_repos_count}, Unique Languages: {len(unique_languages)}, Contributed Repos: {contributed_repos_count}")
 
-    for achievement in ACHIEVEMENTS:
-        is_unlocked = True
-        if "min_repos" in achievement and total_repos < achievement["min_repos"]:
-            is_unlocked = False
-        if "min_commits" in achievement and total_commits < achievement["min_commits"]:
-            is_unlocked = False
-        if "min_environmental_repos" in achievement and environmental_repos_count < achievement["min_environmental_repos"]:
-            is_unlocked = False
-        if "min_languages" in achievement and num_unique_languages < achievement["min_languages"]:
-            is_unlocked = False
-        if "min_contributed_repos" in achievement and contributed_repos_count < achievement["min_contributed_repos"]:
-            is_unlocked = False
-
-        if is_unlocked:
-            unlocked_ids.add(achievement["id"])
+    context = {
+        "user_stats": user_stats,
+        "repos_data": repos_data,
+        "environmental_repos": environmental_repos_count,
+        "languages": unique_languages,
+        "contributed_repos": contributed_repos_count,
+    }
+    unlocked_ids = evaluate_achievement_rules(get_achievement_rules(), context)
             
     return unlocked_ids, unique_languages # Also return unique languages for skill tree
 
 # --- README Update Logic ---
 
-def replace_section(full_content, start_marker, end_marker, new_block_content):
+# One scan finds every <!-- NAME_START --> / <!-- NAME_END --> marker and SVG block in the README
+README_TOKEN_PATTERN = re.compile(r'<!-- (\w+)_(START|END) -->|<svg[^>]*>.*?</svg>', re.DOTALL)
+
+def render_readme(readme_content, sections, svg_transform=None):
     """
-    Replaces content between start_marker and end_marker with new_block_content.
-    Handles cases where markers might not be present.
+    Rewrites the README in one pass: the text between <!-- NAME_START --> and <!-- NAME_END --> is
+    replaced for every NAME in sections, and the first SVG block outside those sections is passed
+    through svg_transform (which returns the new SVG, or None to leave it alone).
+    Missing markers leave that section untouched, as before.
     """
-    print(f"DEBUG: Attempting to replace section from '{start_marker}' to '{end_marker}'")
-    parts_before_start = full_content.split(start_marker, 1)
-    
-    if len(parts_before_start) < 2:
-        print(f"Warning: Start marker '{start_marker}' not found. Section not replaced.")
-        return full_content
-
-    content_after_start = parts_before_start[1]
-    
-    parts_after_end = content_after_start.split(end_marker, 1)
-    
-    if len(parts_after_end) < 2:
-        print(f"Warning: End marker '{end_marker}' not found after '{start_marker}'. Section not replaced.")
-        return full_content
-
-    result = (
-        parts_before_start[0] +
-        start_marker + "\n" +
-        new_block_content + "\n" +
-        end_marker +
-        parts_after_end[1]
-    )
-    print(f"DEBUG: Section '{start_marker}' replaced successfully.")
-    return result
-
-def update_readme_sections(readme_content, unlocked_achievement_ids, active_languages, skills_config):
+    starts, ends, svg_matches = {}, {}, []
+    for match in README_TOKEN_PATTERN.finditer(readme_content):
+        name, kind = match.group(1), match.group(2)
+        if name is None:
+            svg_matches.append(match)
+        elif kind == "START":
+            starts.setdefault(name, []).append(match)
+        else:
+            ends.setdefault(name, []).append(match)
+
+    edits = [] # (start, end, replacement), non-overlapping
+    for name, block in sections.items():
+        start_marker, end_marker = f"<!-- {name}_START -->", f"<!-- {name}_END -->"
+        if name not in starts:
+            print(f"Warning: Start marker '{start_marker}' not found. Section not replaced.")
+            continue
+        start = starts[name][0]
+        end = next((m for m in ends.get(name, []) if m.start() >= start.end()), None)
+        if end is None:
+            print(f"Warning: End marker '{end_marker}' not found after '{start_marker}'. Section not replaced.")
+            continue
+        edits.append((start.end(), end.start(), "\n" + block + "\n"))
+        log.debug("Section '%s' replaced successfully.", start_marker)
+
+    if svg_transform is not None:
+        svg_match = next((m for m in svg_matches if not any(a <= m.start() < b for a, b, _ in edits)), None)
+        if svg_match is None:
+            print("Warning: SVG skill tree not found in README.md. Skill colors not updated.")
+        else:
+            new_svg = svg_transform(svg_match.group(0))
+            if new_svg is not None:
+                edits.append((svg_match.start(), svg_match.end(), new_svg))
+
+    if not edits:
+        return readme_content
+    edits.sort()
+    chunks = []
+    position = 0
+    for start, end, replacement in edits:
+        chunks.append(readme_content[position:start])
+        chunks.append(replacement)
+        position = end
+    chunks.append(readme_content[position:])
+    return "".join(chunks)
+
+DEFAULT_ACTIVE_COLOR = "#4CAF50"
+DEFAULT_INACTIVE_COLOR = "#cccccc"
+SVG_CIRCLE_TAG_PATTERN = re.compile(r'<circle\b[^>]*>')
+SVG_ID_ATTR_PATTERN = re.compile(r'\sid="([^"]*)"')
+SVG_FILL_ATTR_PATTERN = re.compile(r'(\s)fill="[^"]*"')
+
+def get_skill_colors(skills_config, active_languages):
+    """Maps each skill id to its target fill, using a keyword -> skills index instead of testing every skill's keywords."""
+    keyword_index = {}
+    for skill_data in skills_config['skills']:
+        for keyword in skill_data['keywords']:
+            keyword_index.setdefault(keyword.lower(), []).append(skill_data['id'])
+    active_ids = {skill_id for language in active_languages for skill_id in keyword_index.get(language, ())}
+
+    colors = {}
+    for skill_data in skills_config['skills']:
+        if skill_data['id'] in active_ids:
+            colors[skill_data['id']] = skill_data.get('color_active', DEFAULT_ACTIVE_COLOR)
+        else:
+            colors[skill_data['id']] = skill_data.get('color_inactive', DEFAULT_INACTIVE_COLOR)
+    return colors
+
+def recolor_skill_tree(svg_content, skills_config, active_languages):
+    """
+    Applies every skill's fill colour in a single pass over the SVG's <circle> tags.
+    Only the first circle with a given id is changed. Returns (updated_svg, set of updated ids).
+    """
+    colors = get_skill_colors(skills_config, active_languages)
+    updated_ids = set()
+
+    def recolor(match):
+        tag = match.group(0)
+        id_match = SVG_ID_ATTR_PATTERN.search(tag)
+        if not id_match:
+            return tag
+        skill_id = id_match.group(1)
+        if skill_id not in colors or skill_id in updated_ids:
+            return tag
+        new_tag, replaced = SVG_FILL_ATTR_PATTERN.subn(rf'\g<1>fill="{colors[skill_id]}"', tag, count=1)
+        if replaced:
+            updated_ids.add(skill_id)
+        return new_tag
+
+    return SVG_CIRCLE_TAG_PATTERN.sub(recolor, svg_content), updated_ids
+
+def update_readme_sections(readme_content, unlocked_achievement_ids, active_languages, skills_config, image_base_url=None):
     """Updates both achievements and skill tree sections."""
+    image_base_url = image_base_url or ACHIEVEMENT_IMAGE_BASE_URL
     
     # 1. Update Achievements Section
     achievements_lines = []
     for achievement in ACHIEVEMENTS:
         img_src = achievement["img_unlocked"] if achievement["id"] in unlocked_achievement_ids else achievement["img_locked"]
-        full_img_url = f"{ACHIEVEMENT_IMAGE_BASE_URL}{img_src}"
+        full_img_url = f"{image_base_url}{img_src}"
         achievements_lines.append(
             f'* <img src="{full_img_url}" width="24" height="24" alt="{achievement["id"]}"> {achievement["message"]}'
         )
     new_achievements_block = "\n".join(achievements_lines)
-    
-    # Use explicit markers for the achievements section
-    ACHIEVEMENTS_START_MARKER = "<!-- ACHIEVEMENTS_START -->"
-    ACHIEVEMENTS_END_MARKER = "<!-- ACHIEVEMENTS_END -->"
-    readme_content = replace_section(
-        readme_content,
-        ACHIEVEMENTS_START_MARKER,
-        ACHIEVEMENTS_END_MARKER,
-        new_achievements_block
-    )
-    print("DEBUG: Achievements section processing complete.")
 
     # 2. Update Skill Tree Colors (within the SVG block)
-    svg_pattern = re.compile(r'(<svg[^>]*>.*?<\/svg>)', re.DOTALL)
-    svg_match = svg_pattern.search(readme_content)
-
-    if svg_match:
-        svg_content = svg_match.group(1)
-        original_svg_block = svg_match.group(0)
-        
-        print(f"DEBUG: SVG block found. Length: {len(svg_content)}. First 100 chars: {svg_content[:100]}...")
-
+    def recolor_svg(svg_content):
+        log.debug("SVG block found. Length: %d. First 100 chars: %s...", len(svg_content), svg_content[:100])
         if not svg_content.strip(): # Check if extracted content is empty or just whitespace
             print("Warning: Extracted SVG content is empty or whitespace. Skipping skill tree coloring.")
-            return readme_content 
+            return None
 
-        DEFAULT_INACTIVE_COLOR = "#cccccc"
-        
-        updated_svg_content = svg_content # Work on a copy
+        with instrumentation.span("recolor_svg"):
+            updated_svg_content, updated_ids = recolor_skill_tree(svg_content, skills_config, active_languages)
+        log.debug("Updated %d skill node(s) in one pass.", len(updated_ids))
+        if log.isEnabledFor(logging.DEBUG):
+            missing_ids = [skill['id'] for skill in skills_config['skills'] if skill['id'] not in updated_ids]
+            if missing_ids:
+                log.debug("Skill ID(s) not found in SVG, skipped: %s", ", ".join(missing_ids))
+        return updated_svg_content
 
-        for skill_data in skills_config['skills']:
-            skill_id = skill_data['id']
-            keywords = [k.lower() for k in skill_data['keywords']]
-            active_color = skill_data.get('color_active', "#4CAF50")
-            inactive_color = skill_data.get('color_inactive', DEFAULT_INACTIVE_COLOR)
-            
-            is_skill_active = any(keyword in active_languages for keyword in keywords)
-            target_color = active_color if is_skill_active else inactive_color
-            
-            pattern_circle = re.compile(
-                rf'(<circle[^>]*id="{re.escape(skill_id)}"[^>]*?)fill="[^"]*"([^>]*?>)'
-            )
-            
-            # Use search first to check if the skill ID exists in the SVG
-            if pattern_circle.search(updated_svg_content):
-                updated_svg_content = pattern_circle.sub(rf'\g<1>fill="{target_color}"\g<2>', updated_svg_content, 1)
-                print(f"DEBUG: Successfully updated skill ID: {skill_id} to color: {target_color}")
-            else:
-                print(f"DEBUG: Skill ID '{skill_id}' not found in SVG. Skipping color update for this skill.")
-        
-        # Replace the old SVG block with the new, updated SVG block in the README
-        readme_content = readme_content.replace(original_svg_block, updated_svg_content)
-        print("DEBUG: SVG block replaced in README content.")
-    else:
-        print("Warning: SVG skill tree not found in README.md. Skill colors not updated.")
+    # Both edits are applied in a single scan and rebuild of the README
+    with instrumentation.span("render_readme"):
+        return render_readme(readme_content, {"ACHIEVEMENTS": new_achievements_block}, recolor_svg)
 
-    return readme_content
 
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
 
-def main():
-    readme_path = "README.md"
-    skills_config_path = ".github/scripts/skills_config.json"
-
+def write_if_changed(path, content):
+    """
+    Writes content to path unless the file's content hash already matches. Returns True if it was written.
+    The new file is written to a temporary file next to it and renamed into place, so it is never half-written.
+    """
+    data = content.encode("utf-8")
     try:
-        with open(readme_path, "r", encoding="utf-8") as f:
-            readme_content = f.read()
+        with open(path, "rb") as f:
+            existing = f.read()
+        mode = os.stat(path).st_mode & 0o777
     except FileNotFoundError:
-        print(f"Error: {readme_path} not found.")
-        exit(1)
+        existing = None
+        mode = 0o644
+    if existing is not None and len(existing) == len(data) and content_hash(existing) == content_hash(data):
+        return False
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".readme-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return True
+
+def state_path_for(username, batch=False):
+    """Returns the RepoState file for a user; batch runs keep one file per user next to GITHUB_STATE_FILE."""
+    if not GITHUB_STATE_FILE:
+        return None
+    if not batch:
+        return GITHUB_STATE_FILE
+    root, ext = os.path.splitext(GITHUB_STATE_FILE)
+    return f"{root}-{username}{ext}"
+
+def cost_report_path_for(username, batch=False):
+    """Returns the commit cost report path for a user, or None. Batch runs always write one report per user."""
+    if not GITHUB_COMMIT_COST_REPORT:
+        return None
+    if "{username}" in GITHUB_COMMIT_COST_REPORT:
+        return GITHUB_COMMIT_COST_REPORT.replace("{username}", username)
+    if not batch:
+        return GITHUB_COMMIT_COST_REPORT
+    root, ext = os.path.splitext(GITHUB_COMMIT_COST_REPORT)
+    return f"{root}-{username}{ext}"
+
+def update_profile(username, readme_path, skills_config, token, backend=None, state_path=None, cost_report_path=None):
+    """Fetches stats for one user and rewrites their README. Returns True if the file changed."""
+    with open(readme_path, "r", encoding="utf-8") as f:
+        readme_content = f.read()
+
+    state = RepoState(state_path, username).load() if state_path else None
+    cost_report = {}
+    with instrumentation.span("fetch"):
+        user_stats, all_repos_data = fetch_github_data(username, token, backend, state, cost_report)
+    print(f"[{username}] Total Commits: {user_stats['total_commits']}, Total Repos: {user_stats['total_repos']}")
+    if cost_report:
+        print(f"[{username}] {summarize_commit_costs(cost_report)}")
+        if cost_report_path:
+            with open(cost_report_path, "w", encoding="utf-8") as f:
+                json.dump(cost_report, f, indent=2, sort_keys=True)
+
+    with instrumentation.span("evaluate_achievements"):
+        unlocked_achievement_ids, active_languages = get_unlocked_achievements(user_stats, all_repos_data, state, username, token)
+    if state is not None:
+        state.prune(all_repos_data)
+        state.save()
+        print(f"[{username}] {state.summary()}")
+
+    print(f"[{username}] Unlocked Achievement IDs:", unlocked_achievement_ids)
+    print(f"[{username}] Active Languages Detected:", active_languages)
+
+    # Update both sections with the new, more robust function
+    readme_content = update_readme_sections(readme_content, unlocked_achievement_ids, active_languages, skills_config,
+                                            achievement_image_base_url(username))
+    with instrumentation.span("write_readme"):
+        return write_if_changed(readme_path, readme_content)
+
+def load_batch(path):
+    """
+    Reads a batch file: a JSON list of {"username": ..., "readme": ...} objects,
+    or plain text with one 'username readme_path' pair per line.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return [(entry['username'], entry['readme']) for entry in json.loads(text)]
+    jobs = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            username, readme = line.split(None, 1)
+            jobs.append((username, readme))
+    return jobs
+
+def run_batch(jobs, skills_config, token, backend=None, workers=4):
+    """Updates several profiles concurrently, sharing the HTTP session, caches and scheduler. Returns failed usernames."""
+    enable_response_memo()
+
+    def run_job(job):
+        username, readme_path = job
+        try:
+            changed = update_profile(username, readme_path, skills_config, token, backend, state_path_for(username, batch=True),
+                                     cost_report_path_for(username, batch=True))
+            print(f"[{username}] {readme_path} {'updated' if changed else 'unchanged'}.")
+            return None
+        except (OSError, requests.exceptions.RequestException) as e:
+            print(f"[{username}] Error: {e}")
+            return username
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as executor:
+            return [username for username in executor.map(run_job, jobs) if username]
+    finally:
+        disable_response_memo()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Update the profile README with GitHub achievements and skill tree colors.")
+    parser.add_argument("--backend", choices=DATA_BACKENDS, default=None,
+                        help="Data source for stats (default: GITHUB_DATA_BACKEND or 'rest').")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="Update many profiles: JSON list of {username, readme} or 'username readme_path' lines.")
+    parser.add_argument("--batch-workers", type=int, default=4, help="Profiles processed at once in batch mode.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show debug output (same as ACHIEVEMENTS_LOG_LEVEL=DEBUG).")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Only this script's logger follows the chosen level, so library debug output stays off
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    log.setLevel(logging.DEBUG if args.verbose else getattr(logging, ACHIEVEMENTS_LOG_LEVEL, logging.INFO))
+    readme_path = "README.md"
+    skills_config_path = ".github/scripts/skills_config.json"
 
     try:
         with open(skills_config_path, "r", encoding="utf-8") as f:
@@ -267,33 +856,40 @@ def main():
         print(f"Error: Could not parse {skills_config_path}. Check JSON syntax.")
         exit(1)
 
-    if not GITHUB_USERNAME:
-        print("Error: GITHUB_USERNAME environment variable not set.")
-        exit(1)
-
-    print(f"Fetching stats for {GITHUB_USERNAME}...")
+    if args.batch:
+        try:
+            jobs = load_batch(args.batch)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error: Could not read batch file {args.batch}: {e}")
+            exit(1)
+    else:
+        if not os.path.exists(readme_path):
+            print(f"Error: {readme_path} not found.")
+            exit(1)
+        if not GITHUB_USERNAME:
+            print("Error: GITHUB_USERNAME environment variable not set.")
+            exit(1)
+        jobs = None
+
+    if GITHUB_HTTP_CACHE:
+        enable_http_cache(GITHUB_HTTP_CACHE)
+    if GITHUB_API_RECORD:
+        enable_recorder(GITHUB_API_RECORD)
     
     try:
-        user_stats = {}
-        total_commits, total_repos = get_user_stats(GITHUB_USERNAME, GITHUB_TOKEN)
-        user_stats = {
-            "total_commits": total_commits,
-            "total_repos": total_repos
-        }
-        print(f"Total Commits: {total_commits}, Total Repos: {total_repos}")
-
-        all_repos_data = get_all_repo_data(GITHUB_USERNAME, GITHUB_TOKEN)
-        unlocked_achievement_ids, active_languages = get_unlocked_achievements(user_stats, all_repos_data)
-        
-        print("Unlocked Achievement IDs:", unlocked_achievement_ids)
-        print("Active Languages Detected:", active_languages)
-        
-        # Update both sections with the new, more robust function
-        readme_content = update_readme_sections(readme_content, unlocked_achievement_ids, active_languages, skills_config)
-
-        with open(readme_path, "w", encoding="utf-8") as f:
-            f.write(readme_content)
-        print("README.md updated successfully with achievements and skill tree colors.")
+        if jobs is not None:
+            print(f"Updating {len(jobs)} profiles...")
+            failed = run_batch(jobs, skills_config, GITHUB_TOKEN, args.backend, args.batch_workers)
+            if failed:
+                print(f"Error: {len(failed)} profile(s) failed: {', '.join(failed)}")
+                exit(1)
+        else:
+            print(f"Fetching stats for {GITHUB_USERNAME}...")
+            if update_profile(GITHUB_USERNAME, readme_path, skills_config, GITHUB_TOKEN, args.backend, state_path_for(GITHUB_USERNAME),
+                              cost_report_path_for(GITHUB_USERNAME)):
+                print("README.md updated successfully with achievements and skill tree colors.")
+            else:
+                print("README.md already up to date.")
 
     except requests.exceptions.RequestException as e:
         print(f"Error fetching GitHub data: {e}")
@@ -305,6 +901,19 @@ def main():
         import traceback
         traceback.print_exc()
         exit(1)
+    finally:
+        cache = disable_http_cache()
+        if cache is not None:
+            print(cache.summary())
+        recorder = disable_recorder()
+        if recorder is not None:
+            print(f"Recorded {len(recorder.entries)} API responses to {recorder.path}")
+        print(scheduler.summary())
+        for name, stats in instrumentation.snapshot()['spans'].items():
+            print(f"  span {name}: {stats['count']}x, {stats['total_s']:.3f}s total")
+        if GITHUB_API_METRICS:
+            instrumentation.export(GITHUB_API_METRICS, api=scheduler.metrics(),
+                                   http_cache={"hits": cache.hits, "misses": cache.misses} if cache is not None else None)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,126 @@
+# simulators/bench_server.py
+# Load generator for sim_server.py. Starts a server in-process, connects N simulated players that
+# each play a command script (by default the full story), and reports round-trip latency
+# percentiles and server-side command latency. Memory per session is measured separately (with
+# tracemalloc, which would distort the latency numbers) by playing the same script in N sessions.
+#
+# Usage: python simulators/bench_server.py [--players 1000] [--script play.txt] [--concurrency 1000]
+
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from hacking_puzzle import Session, read_script, run_headless
+from sim_server import SimulatorServer
+
+PROMPT_END = b"$ "
+
+# Reads every story file and reaches the final stage
+DEFAULT_SCRIPT = """
+ls
+access reform_server_1_login
+cd /servers/reform_server_1/data
+cat project_ostrich_memo.txt
+find alpha omega
+cd ../health_policy_records
+cat email_alpha_omega_initiative.txt
+cat alpha_omega_healthcare_draft.pdf
+cat ukraine_medical_aid_proposal_draft.txt
+cd ../strategic_partnerships_data
+ls
+cat donor_log_q1_2025.xlsx
+find liberty
+cd ../global_network_intelligence
+cat global_liberty_fund_memo.txt
+cat european_values_conference_summary.pdf
+cat cross_border_propaganda_channels.txt
+"""
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000 if ordered else 0.0
+
+
+async def player(port, commands, latencies, gate, started):
+    """One simulated player: connects, waits until everyone is connected, then plays its commands."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=1 << 20)
+    await reader.readuntil(PROMPT_END) # Intro and first prompt
+    started.append(True)
+    await gate.wait()
+    for command in commands:
+        start = time.perf_counter()
+        writer.write(command.encode("utf-8") + b"\n")
+        await reader.readuntil(PROMPT_END)
+        latencies.append(time.perf_counter() - start)
+    return writer
+
+
+def session_memory(players, commands):
+    """(bytes held, filesystem nodes owned) per session after each of `players` sessions has played the commands."""
+    run_headless(commands) # Build shared state (e.g. the base search index) outside the measurement
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    sessions = [Session() for _ in range(players)]
+    for session in sessions:
+        run_headless(commands, session)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    nodes = sum(session.state['files'].delta_size() for session in sessions) # Copy-on-write nodes, not shared with the base world
+    return held / players, nodes / players
+
+
+async def run(players, commands, concurrency):
+    server = await SimulatorServer(port=0, max_sessions=players + 1).start()
+    latencies, started, writers = [], [], []
+    gate = asyncio.Event()
+    start = time.perf_counter()
+    for first in range(0, players, concurrency):
+        batch = [asyncio.create_task(player(server.port, commands, latencies, gate, started))
+                 for _ in range(first, min(players, first + concurrency))]
+        while len(started) < min(players, first + concurrency):
+            await asyncio.sleep(0.01)
+        gate.set()
+        writers.extend(await asyncio.gather(*batch))
+        gate.clear()
+    elapsed = time.perf_counter() - start
+
+    # Every player has finished its script but is still connected, so all sessions are live
+    stats = server.stats()
+    for writer in writers:
+        writer.close()
+    while server.sessions: # Let every session see EOF and finish before shutting down
+        await asyncio.sleep(0.01)
+    await server.close()
+
+    print(f"{players} players x {len(commands)} commands in {elapsed:.2f} s "
+          f"({players * len(commands) / elapsed:,.0f} commands/s), {stats['active_sessions']} sessions live at the end")
+    print(f"  round trip:     p50 {percentile(latencies, 0.50):.2f} ms, p99 {percentile(latencies, 0.99):.2f} ms, "
+          f"max {percentile(latencies, 1.0):.2f} ms")
+    print(f"  handle_command: p50 {stats['p50_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms, max {stats['max_ms']:.3f} ms")
+    held, nodes = session_memory(players, commands)
+    print(f"  memory:         {held / 1024:.1f} KiB per session after the script, {nodes:.1f} filesystem nodes of its own")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the simulator server with many concurrent players.")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=1000, help="Players that play at the same time.")
+    parser.add_argument("--script", help="Command script for every player (default: the full story).")
+    args = parser.parse_args()
+
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            commands = read_script(f)
+    else:
+        commands = read_script(DEFAULT_SCRIPT.splitlines())
+    commands = [command for command in commands if command.split(' ', 1)[0].lower() != "exit"] # Keep sessions open
+    asyncio.run(run(args.players, commands, max(1, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# simulators/bench_sim.py
+# Stress benchmark for the simulator's hot paths on generated worlds (see world_gen.py).
+# For each world size it times ls, cd, cat and find through Session.handle_command, the first
+# 'find' (which builds the shared search index) and stage progression with and without a search
+# index, and reports memory for the world, the index and one played-through session. Output goes
+# to stdout as a table and, with --json, as one JSON object per size so runs can be compared.
+#
+# World and session memory are measured with tracemalloc in separate phases so tracing does not
+# distort the timings. Building the index under tracemalloc would take minutes at 1M nodes, so its
+# memory is the resident-set growth read from /proc (Linux only), which runs low when freed memory
+# is reused.
+#
+# Usage: python simulators/bench_sim.py [--sizes 1000,100000,1000000] [--seed 1] [--content-size 16] [--json FILE]
+
+import argparse
+import gc
+import json
+import os
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+import hacking_puzzle
+from hacking_puzzle import Session
+from vfs import VirtualFS
+from world_gen import generate_world, node_count, shape_for_nodes
+
+SIZES = (1_000, 100_000, 1_000_000)
+TIME_BUDGET = 1.0 # Seconds spent repeating one command at most
+
+
+def resident_bytes():
+    """Current resident set size, or None where /proc is not available."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def rss_delta(before):
+    after = resident_bytes()
+    return after - before if before is not None and after is not None else None
+
+
+def new_session(access_level=2):
+    """A session that may use 'find' without playing the first stage."""
+    session = Session()
+    session.state['access_level'] = access_level
+    return session
+
+
+def timed(session, command, repeat):
+    """Mean milliseconds per run of command, repeated up to `repeat` times or TIME_BUDGET seconds."""
+    runs, total = 0, 0.0
+    with open(os.devnull, "w") as sink, redirect_stdout(sink):
+        while runs < repeat and (runs == 0 or total < TIME_BUDGET):
+            start = time.perf_counter()
+            session.handle_command(command)
+            total += time.perf_counter() - start
+            runs += 1
+    return total / runs * 1000
+
+
+def required_paths(scenario):
+    """Absolute paths of the files each stage requires, in stage order."""
+    locations = {}
+    for path, entries in scenario['layout'].items():
+        for name in entries:
+            locations[name] = path + name
+    for stage in scenario['stages']:
+        for path, entries in stage['mounts'].items():
+            for name in entries:
+                locations[name] = path + name
+    return [[locations[name] for name in stage['requires']] for stage in scenario['stages']]
+
+
+def play_stages(session, stage_paths):
+    """Reads every required file; returns milliseconds per stage spent in the 'cat' that entered it."""
+    transitions = []
+    with open(os.devnull, "w") as sink, redirect_stdout(sink):
+        for paths in stage_paths:
+            for path in paths[:-1]:
+                session.handle_command(f"cat {path}")
+            start = time.perf_counter()
+            session.handle_command(f"cat {paths[-1]}")
+            transitions.append((time.perf_counter() - start) * 1000)
+    return transitions
+
+
+def traced_bytes(func, *args):
+    """Bytes still allocated by func(*args) once it returns, and its result."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = func(*args)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return held, result
+
+
+def play_session(stage_paths):
+    session = new_session()
+    with open(os.devnull, "w") as sink, redirect_stdout(sink):
+        session.handle_command("find stage")
+    play_stages(session, stage_paths)
+    return session
+
+
+def session_memory(stage_paths):
+    """Bytes one session holds after finding a file and playing through every stage."""
+    return traced_bytes(play_session, stage_paths)[0]
+
+
+def bench_size(nodes, seed, content_size, repeat):
+    result = {"target_nodes": nodes}
+    start = time.perf_counter()
+    scenario = generate_world(seed=seed, content_size=content_size, **shape_for_nodes(nodes))
+    result['generate_s'] = time.perf_counter() - start
+    result['nodes'] = node_count(scenario)
+    stage_paths = required_paths(scenario)
+
+    start = time.perf_counter()
+    hacking_puzzle.load_scenario(scenario['layout'], scenario['contents'], scenario['stages'])
+    result['world_build_s'] = time.perf_counter() - start
+    result['world_bytes'] = traced_bytes(VirtualFS.from_layout, scenario['layout'])[0] # A second, traced copy
+
+    # The largest directory and the deepest directory of the generated tree
+    largest = max(scenario['layout'], key=lambda path: len(scenario['layout'][path]))
+    deepest = max(scenario['layout'], key=lambda path: path.count("/"))
+    first_file = next(name for name in scenario['layout'][largest] if not name.endswith("/"))
+    common_word = first_file.split("_", 1)[0]
+    del scenario
+
+    session = new_session()
+    result['ls_root_ms'] = timed(session, "ls /", repeat)
+    result['ls_largest_ms'] = timed(session, f"ls {largest}", repeat)
+    result['cd_deep_ms'] = timed(session, f"cd {deepest}", repeat)
+    result['cd_up_ms'] = timed(session, "cd ..", 1)
+    with open(os.devnull, "w") as sink, redirect_stdout(sink):
+        session.handle_command(f"cd {largest}")
+    result['cat_ms'] = timed(session, f"cat {first_file}", repeat)
+
+    gc.collect()
+    before = resident_bytes()
+    result['index_build_ms'] = timed(session, f"find {common_word}", 1) # The first find builds the shared index
+    result['index_rss_bytes'] = rss_delta(before)
+    result['find_word_ms'] = timed(session, f"find {common_word}", repeat)
+    result['find_prefix_ms'] = timed(session, f"find {common_word[:2]}", repeat)
+    result['find_name_ms'] = timed(session, f"find {first_file}", repeat)
+
+    transitions = play_stages(Session(), stage_paths)
+    result['stage_ms'] = sum(transitions) / len(transitions) if transitions else 0.0
+    indexed = new_session()
+    timed(indexed, "find stage", 1)
+    transitions = play_stages(indexed, stage_paths)
+    result['stage_indexed_ms'] = sum(transitions) / len(transitions) if transitions else 0.0
+    del session, indexed
+
+    result['session_bytes'] = session_memory(stage_paths)
+    return result
+
+
+def mib(value):
+    return f"{value / (1 << 20):.1f} MiB" if value is not None else "n/a"
+
+
+def report(result):
+    print(f"{result['nodes']:,} nodes (generated in {result['generate_s']:.2f} s)")
+    print(f"  world:   built in {result['world_build_s']:.2f} s, {mib(result['world_bytes'])}")
+    print(f"  index:   built by the first find in {result['index_build_ms'] / 1000:.2f} s, {mib(result['index_rss_bytes'])}")
+    print(f"  ls:      / {result['ls_root_ms']:.3f} ms, largest directory {result['ls_largest_ms']:.3f} ms")
+    print(f"  cd:      deepest directory {result['cd_deep_ms']:.3f} ms, '..' {result['cd_up_ms']:.3f} ms")
+    print(f"  cat:     {result['cat_ms']:.3f} ms")
+    print(f"  find:    word {result['find_word_ms']:.3f} ms, prefix {result['find_prefix_ms']:.3f} ms, "
+          f"file name {result['find_name_ms']:.3f} ms")
+    print(f"  stages:  {result['stage_ms']:.3f} ms per unlock, {result['stage_indexed_ms']:.3f} ms with a search index")
+    print(f"  session: {result['session_bytes'] / 1024:.1f} KiB after playing every stage")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark simulator commands on generated worlds.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in SIZES), help="Comma-separated world sizes in nodes.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--content-size", type=int, default=16, help="Words per generated file body.")
+    parser.add_argument("--repeat", type=int, default=200, help="Runs per timed command (capped by a 1 s budget).")
+    parser.add_argument("--json", metavar="FILE", help="Also write one JSON result per size to FILE.")
+    args = parser.parse_args()
+
+    hacking_puzzle.COSMETIC_DELAYS = False
+    hacking_puzzle.SAVES_ENABLED = False
+    results = []
+    for size in (int(size) for size in args.sizes.split(",") if size.strip()):
+        results.append(bench_size(size, args.seed, args.content_size, max(1, args.repeat)))
+        report(results[-1])
+        gc.collect()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
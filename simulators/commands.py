@@ -0,0 +1,75 @@
+# simulators/commands.py
+# Command-line plumbing for the hacking simulator: the command registry record, the tokenizer
+# and an optional per-command latency profiler.
+# Handlers are registered in hacking_puzzle.py (and by plugins) with register_command; Session
+# looks the command up in one dict instead of walking an if/elif chain.
+
+import math
+import shlex
+import threading
+
+
+class Command:
+    __slots__ = ('name', 'handler', 'usage', 'help')
+
+    def __init__(self, name, handler, usage, help):
+        self.name = name
+        self.handler = handler # handler(session, args) -> False to end the session, anything else to continue
+        self.usage = usage
+        self.help = help
+
+    def __repr__(self):
+        return f"Command({self.name!r})"
+
+
+def tokenize_command(line):
+    """Splits a command line into (action, args). Quotes group words; an unbalanced quote falls back to plain whitespace splitting.
+    Backslashes are kept as typed, as they were before quoting was supported."""
+    lexer = shlex.shlex(line, posix=True)
+    lexer.whitespace_split = True
+    lexer.commenters = ""
+    lexer.escape = ""
+    try:
+        parts = list(lexer)
+    except ValueError: # e.g. find Sharma's
+        parts = line.split()
+    if not parts:
+        return "", []
+    return parts[0].lower(), parts[1:]
+
+
+# --- Profiling ---
+class CommandProfiler:
+    """Per-command latency histograms with power-of-two microsecond buckets (bucket b holds latencies below 2**b us)."""
+
+    def __init__(self):
+        self.histograms = {} # command -> {bucket: count}
+        self.totals = {} # command -> [count, total seconds, max seconds]
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        bucket = max(0, math.ceil(math.log2(seconds * 1e6))) if seconds > 0 else 0
+        with self._lock:
+            histogram = self.histograms.setdefault(name, {})
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+            totals = self.totals.setdefault(name, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+
+    def to_dict(self):
+        with self._lock:
+            return {name: {"count": count, "total_ms": total * 1000, "max_ms": longest * 1000,
+                           "buckets_us": {str(2 ** bucket): n for bucket, n in sorted(self.histograms[name].items())}}
+                    for name, (count, total, longest) in sorted(self.totals.items())}
+
+    def report(self):
+        """Human-readable histograms, slowest command (by total time) first."""
+        summary = self.to_dict()
+        lines = []
+        for name, stats in sorted(summary.items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(f"{name}: {stats['count']} calls, mean {stats['total_ms'] / stats['count']:.3f} ms, max {stats['max_ms']:.3f} ms")
+            peak = max(stats['buckets_us'].values())
+            for upper, count in stats['buckets_us'].items():
+                lines.append(f"  < {upper:>8} us {count:>8} {'#' * max(1, round(40 * count / peak))}")
+        return "\n".join(lines)
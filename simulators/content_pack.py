@@ -0,0 +1,215 @@
+# simulators/content_pack.py
+# Packed, memory-mapped content archives for the hacking simulator.
+# A pack stores file bodies as UTF-8 after a small offset index:
+#
+#   header  b"HSCP" | version u16 | entry count u32 | index size u32
+#   index   per entry: key length u16 | key (UTF-8) | body offset u64 | body length u32
+#   bodies  concatenated UTF-8 bodies; offsets are relative to the end of the index
+#
+# Opening a pack only reads the index. The file is memory-mapped and a body is decoded when it is
+# first asked for (view_file or the search index), so startup time and resident memory do not grow
+# with the size of the scenario text.
+#
+# Usage:
+#   python simulators/content_pack.py build scenario.pack                 (packs the built-in story content)
+#   python simulators/content_pack.py build scenario.pack --from texts/   (one entry per file, keyed by name)
+#   python simulators/content_pack.py list scenario.pack
+
+import argparse
+import mmap
+import os
+import struct
+import tempfile
+
+MAGIC = b"HSCP"
+PACK_VERSION = 1
+_HEADER = struct.Struct("<4sHII")
+_KEY_LENGTH = struct.Struct("<H")
+_LOCATION = struct.Struct("<QI")
+
+
+def write_pack(path, contents):
+    """Writes {key: body} to a pack file atomically."""
+    index = bytearray()
+    bodies = []
+    offset = 0
+    for key, body in contents.items():
+        data = body.encode("utf-8")
+        encoded_key = key.encode("utf-8")
+        index += _KEY_LENGTH.pack(len(encoded_key)) + encoded_key + _LOCATION.pack(offset, len(data))
+        bodies.append(data)
+        offset += len(data)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".content_pack-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, PACK_VERSION, len(contents), len(index)))
+            f.write(index)
+            for data in bodies:
+                f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class ContentPack:
+    """Read-only {key: body} view of a pack file; bodies are decoded from the mapping on access."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, count, index_size = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != PACK_VERSION:
+                raise ValueError(f"{path} is not a version {PACK_VERSION} content pack")
+            self.index = {}
+            position = _HEADER.size
+            for _ in range(count):
+                (key_length,) = _KEY_LENGTH.unpack_from(self._map, position)
+                position += _KEY_LENGTH.size
+                key = self._map[position:position + key_length].decode("utf-8")
+                position += key_length
+                self.index[key] = _LOCATION.unpack_from(self._map, position)
+                position += _LOCATION.size
+            self._data_start = _HEADER.size + index_size
+        except BaseException:
+            self._map.close()
+            raise
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __getitem__(self, key):
+        offset, length = self.index[key]
+        start = self._data_start + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def __len__(self):
+        return len(self.index)
+
+    def keys(self):
+        return self.index.keys()
+
+    def size(self, key):
+        return self.index[key][1]
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ContentStore:
+    """The simulator's file contents: loaded packs (latest first) over an in-memory dict.
+
+    Writes (e.g. stage contents) go to the dict; a body in a pack takes precedence, so a pack can
+    replace or extend the built-in story text. overlay() returns a child store for one session:
+    its writes stay local and everything else is read through from the shared parent.
+    """
+
+    def __init__(self, contents=None, parent=None):
+        self.contents = dict(contents or {})
+        self.packs = []
+        self.parent = parent
+
+    def add_pack(self, pack):
+        self.packs.insert(0, pack)
+
+    def overlay(self):
+        return ContentStore(parent=self)
+
+    def _source(self, key):
+        """The pack or dict that holds key: packs anywhere in the chain first, then dicts, nearest first."""
+        store = self
+        while store is not None:
+            for pack in store.packs:
+                if key in pack:
+                    return pack
+            store = store.parent
+        store = self
+        while store is not None:
+            if key in store.contents:
+                return store.contents
+            store = store.parent
+        return None
+
+    def __contains__(self, key):
+        return self._source(key) is not None
+
+    def __getitem__(self, key):
+        source = self._source(key)
+        if source is None:
+            raise KeyError(key)
+        return source[key]
+
+    def get(self, key, default=None):
+        source = self._source(key)
+        return default if source is None else source[key]
+
+    def __setitem__(self, key, body):
+        self.contents[key] = body
+
+    def update(self, contents):
+        self.contents.update(contents)
+
+    def keys(self):
+        keys = self.parent.keys() if self.parent is not None else {}
+        keys = dict.fromkeys(keys)
+        keys.update(dict.fromkeys(self.contents))
+        for pack in self.packs:
+            keys.update(dict.fromkeys(pack.keys()))
+        return keys.keys()
+
+    def __len__(self):
+        return len(self.keys())
+
+
+def builtin_contents():
+    """All story text shipped in hacking_puzzle.py: the initial contents plus every stage's contents."""
+    import hacking_puzzle
+    contents = dict(hacking_puzzle.BUILTIN_CONTENTS)
+    for stage in hacking_puzzle.STAGES:
+        contents.update(stage.get('contents', {}))
+    return contents
+
+
+def directory_contents(directory):
+    """{file name: text} for every file in a directory (not recursive)."""
+    contents = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                contents[name] = f.read()
+    return contents
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect simulator content packs.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    build = subcommands.add_parser("build", help="Pack the built-in story content, or a directory of text files.")
+    build.add_argument("pack")
+    build.add_argument("--from", dest="source", metavar="DIR", help="Pack the files in DIR instead of the built-in content.")
+    listing = subcommands.add_parser("list", help="List the entries of a pack.")
+    listing.add_argument("pack")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        contents = directory_contents(args.source) if args.source else builtin_contents()
+        write_pack(args.pack, contents)
+        print(f"Wrote {len(contents)} entries to {args.pack}")
+    else:
+        with ContentPack(args.pack) as pack:
+            for key in pack.keys():
+                print(f"{pack.size(key):>10}  {key}")
+
+
+if __name__ == "__main__":
+    main()
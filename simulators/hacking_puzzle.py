@@ -1,41 +1,86 @@
-import time
+import argparse
+import importlib
+import io
+import json
 import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+from commands import Command, CommandProfiler, tokenize_command
+from content_pack import ContentPack, ContentStore
+from ingest import Ingestor
+from render import RenderCache, write
+from search_index import SearchIndex, body_weights
+from snapshot import FLAG_ACCESS_GRANTED, Snapshot, read_snapshot, scenario_fingerprint, write_snapshot
+from stages import StageEngine
+from vfs import OverlayFS, VirtualFS, entry_name
+from world_gen import read_scenario
+
+# --- SETTINGS ---
+COSMETIC_DELAYS = os.getenv("HACKSIM_DELAYS", "1") != "0" # Dramatic pauses in interactive play; headless runs turn them off
+FIND_DELAY = float(os.getenv("HACKSIM_FIND_DELAY", "2")) # Cosmetic pause before 'find' results; 0 disables it
+DEBUG_STAGE = os.getenv("HACKSIM_DEBUG") == "1" # Print the current stage after every command
+SAVE_DIR = os.getenv("HACKSIM_SAVE_DIR", ".") # Where 'save'/'load' keep snapshots
+SAVES_ENABLED = True # The server turns this off so players cannot write files on the host
+DEFAULT_SAVE_NAME = "hacking_puzzle.sav"
+CONTENT_PACKS = [path for path in os.getenv("HACKSIM_CONTENT_PACKS", "").split(os.pathsep) if path] # Extra story content, see content_pack.py
+INGEST_WORKERS = int(os.getenv("HACKSIM_INGEST_WORKERS", "1")) # Background workers preparing upcoming story text; 0 prepares it on demand
+INGEST_PROCESSES = os.getenv("HACKSIM_INGEST_PROCESSES") == "1" # Use worker processes instead of threads
+INGEST_CACHE = int(os.getenv("HACKSIM_INGEST_CACHE", "256")) # Prepared bodies kept in memory, least recently used dropped first
+PAGE_LINES = int(os.getenv("HACKSIM_PAGE_LINES", "0")) # Page 'cat' output longer than this many lines in a terminal; 0 disables paging
+PLUGINS = [name.strip() for name in os.getenv("HACKSIM_PLUGINS", "").split(",") if name.strip()] # Modules imported at startup to register extra commands
 
 # --- GAME DATA & STATE ---
-game_state = {
-    "current_directory": "/",
-    "access_level": 0, # 0: No access, 1: Basic Server, 2: Health Policy, 3: Finance/PR, 4: International, 5: Core
-    "unlocked_files": [], # Stores names of files the player has successfully 'uncovered'
-    "files": {
-        "/": {
-            "README.txt": "Welcome, Agent. Your mission: Expose Reform UK.",
-            "projects/": {},
-            "servers/": {}
-        },
-        "/projects/": {
-            "SERISTIC/": {}
-        },
-        "/projects/SERISTIC/": {
-            ".github/": {},
-            "scripts/": {},
-            "workflows/": {},
-            "PROJECT_TREE.md": "A fictional project documentation file.",
-            "README.md": "README for the SERISTIC project."
-        },
-        "/projects/SERISTIC/scripts/": {
-            "skills_config.json": "A config file with generic settings.",
-            "update_achievements.py": "A python script for a generic project."
-        },
-        "/servers/reform_server_1/": {
-            "login.txt": "Access restricted. Seek vulnerabilities.",
-            "data/": {},
-            "archive/": {}
-        },
-    }
+WORLD_LAYOUT = {
+    "/": {
+        "README.txt": "Welcome, Agent. Your mission: Expose Reform UK.",
+        "projects/": {},
+        "servers/": {}
+    },
+    "/projects/": {
+        "SERISTIC/": {}
+    },
+    "/projects/SERISTIC/": {
+        ".github/": {},
+        "scripts/": {},
+        "workflows/": {},
+        "PROJECT_TREE.md": "A fictional project documentation file.",
+        "README.md": "README for the SERISTIC project."
+    },
+    "/projects/SERISTIC/scripts/": {
+        "skills_config.json": "A config file with generic settings.",
+        "update_achievements.py": "A python script for a generic project."
+    },
+    "/servers/reform_server_1/": {
+        "login.txt": "Access restricted. Seek vulnerabilities.",
+        "data/": {},
+        "archive/": {}
+    },
 }
 
+BASE_WORLD = VirtualFS.from_layout(WORLD_LAYOUT) # Shared by every session and never modified
+
+# Mounted by 'access reform_server_1_login'
+INITIAL_ACCESS_MOUNT = ("/servers/reform_server_1/data/", {
+    "README_INTERNAL.txt": "Confidential documents reside here. Handle with care.",
+    "project_ostrich_memo.txt": "project_ostrich_memo.txt",
+    "archive/": {}
+})
+
+def new_game_state():
+    return {
+        "current_directory": "/",
+        "access_level": 0, # 0: No access, 1: Basic Server, 2: Health Policy, 3: Finance/PR, 4: International, 5: Core
+        "current_stage": 0,
+        "access_granted": False, # Set by 'access reform_server_1_login'
+        "unlocked_files": set(), # Names of files the player has successfully 'uncovered'
+        "files": OverlayFS(BASE_WORLD), # The session's copy-on-write view of the world
+    }
+
 # --- NARRATIVE CONTENT ---
-file_contents = {
+# Built-in story text; bodies from packs in CONTENT_PACKS are memory-mapped and take precedence
+BUILTIN_CONTENTS = {
     "project_ostrich_memo.txt": """[INTERNAL MEMO - HIGHLY SENSITIVE]
 ...
 [END OF MEMO]
@@ -54,321 +99,699 @@ file_contents = {
 """
 }
 
-# --- GAME FUNCTIONS ---
+file_contents = ContentStore(BUILTIN_CONTENTS)
+for pack_path in CONTENT_PACKS:
+    file_contents.add_pack(ContentPack(pack_path))
 
-def display_prompt():
-    print(f"\n[ VSC | Editing Test.js | Theme: Trans (Blue) ]")
-    print(f"reform_sim:{game_state['current_directory']}$ ", end="")
-
-def handle_command(command):
-    cmd_parts = command.split(' ', 1)
-    action = cmd_parts[0].lower()
-    arg = cmd_parts[1] if len(cmd_parts) > 1 else ""
-
-    if action == "ls":
-        list_directory(arg)
-    elif action == "cd":
-        change_directory(arg)
-    elif action == "cat":
-        view_file(arg)
-    elif action == "help":
-        display_help()
-    elif action == "access" and arg.lower() == "reform_server_1_login":
-        attempt_initial_access()
-    elif action == "find":
-        simulated_find(arg)
-    elif action == "exit":
-        print("Exiting simulator. Remember the truth you uncovered.")
-        return False
-    else:
-        print(f"Command not recognized: '{action}'. Type 'help' for options.")
-    return True
-
-def normalize_dir(path):
-    # Always end with "/" for directories except root
-    if not path.endswith("/"):
-        path += "/"
-    if path != "/" and path.startswith("//"):
-        path = path[1:]
-    return path
-
-def list_directory(path=""):
-    if not path:
-        target_path = game_state['current_directory']
-    else:
-        if path.startswith("/"):
-            target_path = path
-        else:
-            target_path = os.path.join(game_state['current_directory'], path)
-    target_path = os.path.normpath(target_path).replace("\\", "/")
-    if not target_path.endswith("/"):
-        target_path += "/"
-    if target_path not in game_state['files']:
-        print(f"Error: Directory '{path}' not found.")
-        return
-    print(f"Contents of {target_path}:")
-    contents = game_state['files'][target_path]
-    if not contents:
-        print("    (empty)")
-        return
-    for item, item_content in contents.items():
-        if isinstance(item_content, dict):
-            print(f"    {item}")
-        else:
-            print(f"    {item}")
-
-def change_directory(path):
-    if path == "..":
-        if game_state['current_directory'] == "/":
-            print("Already at root directory.")
-            return
-        parent = os.path.dirname(game_state['current_directory'].rstrip("/"))
-        if not parent:
-            parent = "/"
-        if not parent.endswith("/"):
-            parent += "/"
-        if parent not in game_state['files']:
-            parent = "/"
-        game_state['current_directory'] = parent
-        return
-    if path.startswith("/"):
-        new_path = path
-    else:
-        new_path = os.path.join(game_state['current_directory'], path)
-    new_path = os.path.normpath(new_path).replace("\\", "/")
-    if not new_path.endswith("/"):
-        new_path += "/"
-    if new_path in game_state['files']:
-        game_state['current_directory'] = new_path
-    else:
-        print(f"Error: Directory '{path}' not found.")
+ingestor = Ingestor(INGEST_WORKERS, INGEST_PROCESSES, INGEST_CACHE) # Search weights and rendered text for upcoming stages, see ingest.py
 
-def view_file(filename):
-    """Views the content of a specified file."""
-    file_path = os.path.normpath(os.path.join(game_state['current_directory'], filename))
+shared_listings = RenderCache(4096) # 'ls' output for base directories no session has changed, see render.py
 
-    # Check if the file exists in the current directory's representation
-    if filename in game_state['files'].get(game_state['current_directory'], {}):
-        file_data = game_state['files'][game_state['current_directory']][filename]
-        if isinstance(file_data, dict):
-            print(f"Error: '{filename}' is a directory, not a file.")
-            return
+base_search_index = None # Built by get_base_search_index on the first 'find' of any session
+scenario_fingerprint_cache = None
+profiler = None # A CommandProfiler while enable_profiling() is in effect
 
-        # --- REVISED LOGIC FOR PROJECT OSTRICH MEMO ---
-        if filename == "project_ostrich_memo.txt":
-            # This file is accessible only after access_level 1 is achieved
-            if game_state['access_level'] < 1:
-                print(f"File '{filename}' is inaccessible from your current network privileges. You need to gain 'access' to the main Reform server first.")
-                return
-            # If access_level is 1 or higher, proceed to display content
-        # --- END REVISED LOGIC ---
-
-        # Display content if conditions are met or it's a normal file
-        if file_data in file_contents: # Check if it's a known content key
-            print("\n--- FILE CONTENT START ---")
-            print(file_contents[file_data])
-            print("--- FILE CONTENT END ---\n")
-            if filename not in game_state['unlocked_files']: # Mark as unlocked upon viewing
-                game_state['unlocked_files'].append(filename)
-                trigger_next_stage() # Check if viewing this file triggers the next puzzle
-        else:
-            print(f"Error: Could not retrieve content for '{filename}'. File might be empty or corrupted.")
-    else:
-        print(f"Error: File '{filename}' not found in current directory.")
-
-def simulated_find(keyword):
-    """Simulates a 'find' command to locate files based on keywords."""
-    if game_state['access_level'] < 2:
-        print("You need higher access to use the 'find' command effectively.")
-        print("Hint: You need to read 'project_ostrich_memo.txt' first to unlock this.")
-        return
-
-    print(f"Searching for '{keyword}' across accessible server directories...")
-    time.sleep(2)
-    found_files = []
-
-    # Iterate through all known directories and their contents
-    for path, contents in game_state['files'].items():
-        if isinstance(contents, dict): # Ensure it's a directory
-            for item, item_content in contents.items():
-                # Search in filename
-                if isinstance(item_content, str) and keyword.lower() in item.lower():
-                    found_files.append(os.path.normpath(os.path.join(path, item)))
-                # NOW ALSO SEARCH IN FILE CONTENT if it's a known content key
-                elif isinstance(item_content, str) and item_content in file_contents and \
-                     keyword.lower() in file_contents[item_content].lower():
-                    found_files.append(os.path.normpath(os.path.join(path, item)))
-
-    if found_files:
-        print(f"Found files matching '{keyword}':")
-        for f_path in found_files:
-            print(f"    - {f_path}")
-        print("\nThese files are now accessible if you can navigate to their directories.")
-    else:
-        print(f"No files found matching '{keyword}'.")
-
-def display_help():
-    print("""
-Available Commands:
-  ls [directory]    - List contents of current or specified directory.
-  cd <directory>    - Change current directory. Use '..' to go up.
-  cat <filename>    - View the content of a file.
-  access <target>   - Attempt to gain access to a system (e.g., 'access reform_server_1_login').
-  find <keyword>    - Search for files containing a specific keyword.
-  help              - Display this help message.
-  exit              - Quit the simulator.
-    """)
-
-def attempt_initial_access():
-    if game_state['access_level'] == 0:
-        print("\n[INITIATING ACCESS PROTOCOL]")
-        print("Bypassing login for 'reform_server_1'...")
-        time.sleep(1.5)
-        print("Analyzing network vulnerabilities...")
-        time.sleep(2)
-        print("Weak point found in legacy authentication system. Injecting payload...")
-        time.sleep(1.5)
-        print("ACCESS GRANTED: Root directory of /servers/reform_server_1/data/")
-        game_state['access_level'] = 1
-        # Dynamically add the 'data' directory and 'project_ostrich_memo.txt' to the game state
-        game_state['files']["/servers/reform_server_1/data/"] = {
-            "README_INTERNAL.txt": "Confidential documents reside here. Handle with care.",
-            "project_ostrich_memo.txt": "project_ostrich_memo.txt",
-            "archive/": {}
-        }
-        game_state['files']["/servers/reform_server_1/"]["data/"] = game_state['files']["/servers/reform_server_1/data/"]
-        print("\nYou can now 'cd' into '/servers/reform_server_1/data/' and use 'ls' to explore.")
-        print("Your next objective: Locate and 'cat' the 'project_ostrich_memo.txt'.")
-    else:
-        print("You already have access to the Reform server.")
-
-def trigger_next_stage():
-    # Stage 0 to Stage 1: project_ostrich_memo.txt viewed
-    if "project_ostrich_memo.txt" in game_state['unlocked_files'] and game_state['access_level'] == 1:
-        # Check if stage already progressed to avoid re-triggering messages/adding files
-        if game_state.get('current_stage', 0) < 1: # Check if current_stage is less than 1
-            game_state['current_stage'] = 1
-            game_state['access_level'] = 2 # Access to health policy files
-            health_policy_path = "/servers/reform_server_1/health_policy_records/"
-            game_state['files'][health_policy_path] = {
+# --- STAGES ---
+# Each stage follows the previous one ('after' defaults to number - 1) once every file in
+# 'requires' has been read with at least 'min_access'. Entering it sets the access level, adds
+# the contents, mounts the directories and prints the messages.
+STAGES = [
+    {
+        "number": 1,
+        "requires": ["project_ostrich_memo.txt"],
+        "min_access": 1,
+        "access_level": 2, # Access to health policy files
+        "mounts": {
+            "/servers/reform_server_1/health_policy_records/": {
                 "email_alpha_omega_initiative.txt": "email_alpha_omega_initiative.txt",
                 "alpha_omega_healthcare_draft.pdf": "alpha_omega_healthcare_draft.pdf",
                 "ukraine_medical_aid_proposal_draft.txt": "ukraine_medical_aid_proposal_draft.txt"
             }
-            game_state['files']["/servers/reform_server_1/"]["health_policy_records/"] = game_state['files'][health_policy_path]
-            print("\n--- NEW LEAD UNLOCKED ---")
-            print("The 'Project Ostrich' memo mentions 'Alpha-Omega Initiative' and 'Dr. Anya Sharma'.")
-            print("This suggests a deeper dive into their health policy plans.")
-            print("You need to find a way to search for files related to 'Alpha-Omega' or 'Sharma'.")
-            print("Hint: A new 'find' command has been activated for your current access level.")
-            print("Use 'find <keyword>' to locate these files. Try 'find Alpha-Omega' or 'find Sharma'.")
-
-    # Stage 1 to Stage 2: ALL three health policy files viewed
-    # Added 'ukraine_medical_aid_proposal_draft.txt' to the check
-    elif game_state.get('current_stage', 0) == 1 and all(f in game_state['unlocked_files'] for f in ["email_alpha_omega_initiative.txt", "alpha_omega_healthcare_draft.pdf", "ukraine_medical_aid_proposal_draft.txt"]):
-        # Check if stage already progressed
-        if game_state.get('current_stage', 0) < 2:
-            game_state['current_stage'] = 2
-            game_state['access_level'] = 3 # Access to strategic partnerships and donor info
-            funding_pr_path = "/servers/reform_server_1/strategic_partnerships_data/"
-            game_state['files'][funding_pr_path] = {
+        },
+        "messages": [
+            "\n--- NEW LEAD UNLOCKED ---",
+            "The 'Project Ostrich' memo mentions 'Alpha-Omega Initiative' and 'Dr. Anya Sharma'.",
+            "This suggests a deeper dive into their health policy plans.",
+            "You need to find a way to search for files related to 'Alpha-Omega' or 'Sharma'.",
+            "Hint: A new 'find' command has been activated for your current access level.",
+            "Use 'find <keyword>' to locate these files. Try 'find Alpha-Omega' or 'find Sharma'.",
+        ],
+    },
+    {
+        "number": 2,
+        "requires": ["email_alpha_omega_initiative.txt", "alpha_omega_healthcare_draft.pdf", "ukraine_medical_aid_proposal_draft.txt"],
+        "access_level": 3, # Access to strategic partnerships and donor info
+        "mounts": {
+            "/servers/reform_server_1/strategic_partnerships_data/": {
                 "uk_heritage_values_initiative_report.txt": "uk_heritage_values_initiative_report.txt",
                 "media_strategy_briefing.pdf": "media_strategy_briefing.pdf",
                 "donor_log_q1_2025.xlsx": "donor_log_q1_2025.xlsx"
             }
-            game_state['files']["/servers/reform_server_1/"]["strategic_partnerships_data/"] = game_state['files'][funding_pr_path]
-            file_contents["uk_heritage_values_initiative_report.txt"] = """[CONFIDENTIAL REPORT - UK HERITAGE & VALUES INITIATIVE]
+        },
+        "contents": {
+            "uk_heritage_values_initiative_report.txt": """[CONFIDENTIAL REPORT - UK HERITAGE & VALUES INITIATIVE]
 ...
 [END OF REPORT]
-"""
-            file_contents["media_strategy_briefing.pdf"] = """[CONFIDENTIAL - REFORM UK - PUBLIC RELATIONS STRATEGY BRIEFING]
+""",
+            "media_strategy_briefing.pdf": """[CONFIDENTIAL - REFORM UK - PUBLIC RELATIONS STRATEGY BRIEFING]
 ...
 [END OF BRIEFING]
-"""
-            file_contents["donor_log_q1_2025.xlsx"] = """[CONFIDENTIAL - REFORM UK - DONOR LOG Q1 2025]
+""",
+            "donor_log_q1_2025.xlsx": """[CONFIDENTIAL - REFORM UK - DONOR LOG Q1 2025]
 ...
 NOTE: No significant donations or allocations for direct international humanitarian aid (e.g., Ukraine relief) logged in this period, contrasting sharply with 'values' rhetoric.
-"""
-            print("\n--- DEEPER INSIGHTS UNLOCKED ---")
-            print("You've uncovered details on the 'Alpha-Omega Initiative' and their neglect of Ukraine.")
-            print("Now, pivot to their funding. The donor log mentions 'The Liberty & Progress Fund' and 'Global Liberty Fund'.")
-            print("Use the 'find' command to locate files related to these donors or 'international' connections.")
-            print("Try 'find Liberty' or 'find Global' or 'find international'.")
-
-    # Stage 2 to Stage 3: donor_log_q1_2025.xlsx viewed (THIS WAS MISSING!)
-    elif game_state.get('current_stage', 0) == 2 and "donor_log_q1_2025.xlsx" in game_state['unlocked_files']:
-        # Check if stage already progressed
-        if game_state.get('current_stage', 0) < 3:
-            game_state['current_stage'] = 3
-            game_state['access_level'] = 4 # Access to global network intelligence
-            # Add new directory and files for stage 3
-            game_state['files']["/servers/reform_server_1/global_network_intelligence/"] = {
+""",
+        },
+        "messages": [
+            "\n--- DEEPER INSIGHTS UNLOCKED ---",
+            "You've uncovered details on the 'Alpha-Omega Initiative' and their neglect of Ukraine.",
+            "Now, pivot to their funding. The donor log mentions 'The Liberty & Progress Fund' and 'Global Liberty Fund'.",
+            "Use the 'find' command to locate files related to these donors or 'international' connections.",
+            "Try 'find Liberty' or 'find Global' or 'find international'.",
+        ],
+    },
+    {
+        "number": 3,
+        "requires": ["donor_log_q1_2025.xlsx"],
+        "access_level": 4, # Access to global network intelligence
+        "mounts": {
+            "/servers/reform_server_1/global_network_intelligence/": {
                 "global_liberty_fund_memo.txt": "global_liberty_fund_memo.txt",
                 "european_values_conference_summary.pdf": "european_values_conference_summary.pdf",
                 "cross_border_propaganda_channels.txt": "cross_border_propaganda_channels.txt",
             }
-            game_state['files']["/servers/reform_server_1/"]["global_network_intelligence/"] = game_state['files']["/servers/reform_server_1/global_network_intelligence/"]
-
-            file_contents["global_liberty_fund_memo.txt"] = """[CONFIDENTIAL MEMORANDUM - GLOBAL LIBERTY FUND]
+        },
+        "contents": {
+            "global_liberty_fund_memo.txt": """[CONFIDENTIAL MEMORANDUM - GLOBAL LIBERTY FUND]
 ...
 [END OF MEMO]
-"""
-            file_contents["european_values_conference_summary.pdf"] = """[EUROPEAN VALUES CONFERENCE - SUMMARY REPORT]
+""",
+            "european_values_conference_summary.pdf": """[EUROPEAN VALUES CONFERENCE - SUMMARY REPORT]
 ...
 [END OF REPORT]
-"""
-            file_contents["cross_border_propaganda_channels.txt"] = """[INTERNAL STRATEGY - CROSS-BORDER PROPAGANDA CHANNELS]
+""",
+            "cross_border_propaganda_channels.txt": """[INTERNAL STRATEGY - CROSS-BORDER PROPAGANDA CHANNELS]
 ...
 [END OF STRATEGY]
-"""
-
-            print("\n--- NEW LEAD UNLOCKED ---")
-            print("You've traced the financial backing and their shocking disregard for global crises.")
-            print("Your next target is their 'Global Network Intelligence'.")
-            print("Search for details on 'Global Liberty Fund' or 'European Values Conference' to expose their international web.")
-            print("Hint: You might need to change directories to find these new files.")
-
-    # Final Stage: ALL stage 3 files viewed (if you had this, make sure it's here too)
-    elif game_state.get('current_stage', 0) == 3 and all(f in game_state['unlocked_files'] for f in ["global_liberty_fund_memo.txt", "european_values_conference_summary.pdf", "cross_border_propaganda_channels.txt"]):
-        if game_state.get('current_stage', 0) < 4:
-            game_state['current_stage'] = 4 # Final stage
-            print("\n--- MISSION CRITICAL: FINAL TARGET IDENTIFIED ---")
-            print("You have uncovered the full extent of Reform UK's deceptive operations.")
-            print("The final piece of the puzzle is to expose their core leadership's involvement.")
-            print("Access their core server and find the 'MASTER_PLAN.txt' file.")
-            # Add any final access or directory here if needed
-            game_state['access_level'] = 5
-            # For example, if a new server or path is needed:
-            # game_state['files']["/servers/reform_core_server/"] = {"MASTER_PLAN.txt": "MASTER_PLAN.txt"}
-            # game_state['files']["/servers/"]["reform_core_server/"] = game_state['files']["/servers/reform_core_server/"]
-            file_contents["MASTER_PLAN.txt"] = """[ULTIMATE CONFIDENTIAL - REFORM UK - MASTER PLAN]
+""",
+        },
+        "messages": [
+            "\n--- NEW LEAD UNLOCKED ---",
+            "You've traced the financial backing and their shocking disregard for global crises.",
+            "Your next target is their 'Global Network Intelligence'.",
+            "Search for details on 'Global Liberty Fund' or 'European Values Conference' to expose their international web.",
+            "Hint: You might need to change directories to find these new files.",
+        ],
+    },
+    {
+        "number": 4, # Final stage
+        "requires": ["global_liberty_fund_memo.txt", "european_values_conference_summary.pdf", "cross_border_propaganda_channels.txt"],
+        "access_level": 5,
+        # A new server for the final target would go in "mounts", e.g.
+        # "/servers/reform_core_server/": {"MASTER_PLAN.txt": "MASTER_PLAN.txt"}
+        "contents": {
+            "MASTER_PLAN.txt": """[ULTIMATE CONFIDENTIAL - REFORM UK - MASTER PLAN]
 ...
 [END OF MASTER PLAN]
-"""
+""",
+        },
+        "messages": [
+            "\n--- MISSION CRITICAL: FINAL TARGET IDENTIFIED ---",
+            "You have uncovered the full extent of Reform UK's deceptive operations.",
+            "The final piece of the puzzle is to expose their core leadership's involvement.",
+            "Access their core server and find the 'MASTER_PLAN.txt' file.",
+        ],
+    },
+]
+
+stage_engine = StageEngine(STAGES)
+
+# --- GAME FUNCTIONS ---
+
+def pause(seconds):
+    """Cosmetic delay; skipped when COSMETIC_DELAYS is off."""
+    if COSMETIC_DELAYS and seconds > 0:
+        time.sleep(seconds)
+
+def get_base_search_index():
+    """Returns the shared index over the base world, building it on first use."""
+    global base_search_index
+    if base_search_index is None:
+        index = SearchIndex()
+        weights = {} # Content key -> body weights; many files can share one body
+        for node in BASE_WORLD.walk_files():
+            text = file_contents.get(node.data)
+            body = None
+            if text is not None:
+                body = weights.get(node.data)
+                if body is None:
+                    body = weights[node.data] = body_weights(text)
+            index.add(BASE_WORLD.path_of(node), node.name, body=body)
+        base_search_index = index
+    return base_search_index
+
+def load_scenario(layout, contents, stages):
+    """Replaces the built-in world, story text and stages, e.g. with one from world_gen.py.
+
+    Sessions created earlier keep playing the scenario they started with.
+    """
+    global WORLD_LAYOUT, BASE_WORLD, file_contents, STAGES, stage_engine, base_search_index, scenario_fingerprint_cache
+    WORLD_LAYOUT = layout
+    BASE_WORLD = VirtualFS.from_layout(layout)
+    file_contents = ContentStore(contents)
+    STAGES = stages
+    stage_engine = StageEngine(stages)
+    ingestor.clear()
+    shared_listings.clear()
+    base_search_index = None
+    scenario_fingerprint_cache = None
+
+def layout_keys(entries):
+    """Data of every file in layout entries ({"name": data, "sub/": {...}}), recursively."""
+    for name, value in entries.items():
+        if name.endswith("/") and isinstance(value, dict):
+            yield from layout_keys(value)
+        else:
+            yield value
+
+def get_scenario_fingerprint():
+    global scenario_fingerprint_cache
+    if scenario_fingerprint_cache is None:
+        scenario_fingerprint_cache = scenario_fingerprint(WORLD_LAYOUT, STAGES)
+    return scenario_fingerprint_cache
+
+def enable_profiling():
+    """Starts recording per-command latency histograms. Returns the profiler."""
+    global profiler
+    profiler = CommandProfiler()
+    return profiler
+
+def display_help():
+    print("\nAvailable Commands:")
+    for entry in COMMANDS.values():
+        print(f"  {entry.usage or entry.name:<17} - {entry.help}")
+    print("    ")
+
+# --- COMMANDS ---
+# Command name -> Command. Handlers take (session, args) and return False to end the session.
+COMMANDS = {}
+
+def register_command(name, usage=None, help=""):
+    """Decorator that adds (or replaces) a command; plugins listed in HACKSIM_PLUGINS use it too."""
+    def decorator(func):
+        COMMANDS[name.lower()] = Command(name.lower(), func, usage, help)
+        return func
+    return decorator
+
 
+class Session:
+    """One player's game. The world and story text are shared; the session keeps only its own
+    position and progress plus copy-on-write deltas for what it has unlocked."""
 
-def game_loop():
+    def __init__(self):
+        self.state = new_game_state()
+        self.contents = file_contents.overlay()
+        self.search_index = None # Layered over the shared base index on the first 'find'
+        self.listings = RenderCache() # 'ls' output for directories this session has changed
+        self.schedule_upcoming()
+
+    def display_prompt(self):
+        print(f"\n[ VSC | Editing Test.js | Theme: Trans (Blue) ]")
+        print(f"reform_sim:{self.state['current_directory']}$ ", end="")
+
+    def handle_command(self, command):
+        """Runs one command line. Returns False once the session should end."""
+        action, args = tokenize_command(command)
+        entry = COMMANDS.get(action)
+        if entry is None:
+            print(f"Command not recognized: '{action}'. Type 'help' for options.")
+            return True
+        if profiler is None:
+            return entry.handler(self, args) is not False
+        start = time.perf_counter()
+        try:
+            return entry.handler(self, args) is not False
+        finally:
+            profiler.record(action, time.perf_counter() - start)
+
+    def resolve(self, path):
+        """The node at path, relative to the current directory, or None."""
+        return self.state['files'].resolve(path, self.state['current_directory'])
+
+    def list_directory(self, path=""):
+        directory = self.resolve(path)
+        if directory is None or not directory.is_dir:
+            print(f"Error: Directory '{path}' not found.")
+            return
+        write(self.render_listing(directory))
+
+    def render_listing(self, directory):
+        """The 'ls' output for a directory, from the shared or the session cache while it is current."""
+        fs = self.state['files']
+        if fs.is_shared(directory):
+            cache, version = shared_listings, fs.base
+        else:
+            cache, version = self.listings, (fs, fs.generation)
+        text = cache.get(directory, version)
+        if text is None:
+            lines = [f"Contents of {fs.path_of(directory)}:"]
+            lines.extend(f"    {entry_name(node)}" for node in fs.listdir(directory))
+            if len(lines) == 1:
+                lines.append("    (empty)")
+            text = cache.put(directory, version, "\n".join(lines) + "\n")
+        return text
+
+    def change_directory(self, path):
+        fs = self.state['files']
+        if path == ".." and self.state['current_directory'] == "/":
+            print("Already at root directory.")
+            return
+        directory = self.resolve(path)
+        if directory is not None and directory.is_dir:
+            self.state['current_directory'] = fs.path_of(directory)
+        else:
+            print(f"Error: Directory '{path}' not found.")
+
+    def view_file(self, filename):
+        """Views the content of a file, given by name or by (absolute or relative) path."""
+        node = self.resolve(filename)
+
+        if node is not None:
+            if node.is_dir:
+                print(f"Error: '{filename}' is a directory, not a file.")
+                return
+            file_data = node.data
+
+            # --- REVISED LOGIC FOR PROJECT OSTRICH MEMO ---
+            if node.name == "project_ostrich_memo.txt":
+                # This file is accessible only after access_level 1 is achieved
+                if self.state['access_level'] < 1:
+                    print(f"File '{filename}' is inaccessible from your current network privileges. You need to gain 'access' to the main Reform server first.")
+                    return
+                # If access_level is 1 or higher, proceed to display content
+            # --- END REVISED LOGIC ---
+
+            # Display content if conditions are met or it's a normal file
+            if file_data in self.contents: # Check if it's a known content key
+                write(ingestor.rendered(file_data, self.contents[file_data]), PAGE_LINES)
+                if node.name not in self.state['unlocked_files']: # Mark as unlocked upon viewing
+                    self.state['unlocked_files'].add(node.name)
+                    self.trigger_next_stage(node.name) # Check if viewing this file triggers the next puzzle
+            else:
+                print(f"Error: Could not retrieve content for '{filename}'. File might be empty or corrupted.")
+        elif "/" in filename:
+            print(f"Error: File '{filename}' not found.")
+        else:
+            print(f"Error: File '{filename}' not found in current directory.")
+
+    def simulated_find(self, keyword):
+        """Simulates a 'find' command to locate files based on keywords."""
+        if self.state['access_level'] < 2:
+            print("You need higher access to use the 'find' command effectively.")
+            print("Hint: You need to read 'project_ostrich_memo.txt' first to unlock this.")
+            return
+
+        print(f"Searching for '{keyword}' across accessible server directories...")
+        pause(FIND_DELAY)
+        found_files = [path for path, _ in self.get_search_index().search(keyword)]
+
+        if found_files:
+            print(f"Found files matching '{keyword}':")
+            for f_path in found_files:
+                print(f"    - {f_path}")
+            print("\nThese files are now accessible if you can navigate to their directories.")
+        else:
+            print(f"No files found matching '{keyword}'.")
+
+    def get_search_index(self):
+        """Returns this session's index: the shared base index plus the directories the session mounted."""
+        if self.search_index is None:
+            fs = self.state['files']
+            self.search_index = SearchIndex(base=get_base_search_index())
+            for directory, entries in fs.overlay.items():
+                for node in entries.values():
+                    self._unindex_base(directory, node.name)
+                    for file_node in ([node] if not node.is_dir else fs.walk_files(node)):
+                        self._index_file(file_node)
+        return self.search_index
+
+    def _unindex_base(self, directory, name):
+        """Hides base files that a session entry replaced."""
+        replaced = directory.children.get(name)
+        if replaced is None:
+            return
+        for node in ([replaced] if not replaced.is_dir else BASE_WORLD.walk_files(replaced)):
+            self.search_index.remove(BASE_WORLD.path_of(node))
+
+    def _index_file(self, node):
+        fs = self.state['files']
+        text = self.contents.get(node.data)
+        body = ingestor.weights(node.data, text) if text is not None else None
+        self.search_index.add(fs.path_of(node), node.name, body=body)
+
+    def mount_directory(self, path, entries):
+        """Mounts a directory into this session's world and keeps its search index in step."""
+        fs = self.state['files']
+        if self.search_index is not None:
+            replaced = fs.resolve(path)
+            if replaced is not None and replaced.is_dir:
+                for node in fs.walk_files(replaced):
+                    self.search_index.remove(fs.path_of(node))
+        directory = fs.mount(path, entries)
+        if self.search_index is not None:
+            for node in fs.walk_files(directory):
+                self._index_file(node)
+        return directory
+
+    def attempt_initial_access(self):
+        if self.state['access_level'] == 0:
+            print("\n[INITIATING ACCESS PROTOCOL]")
+            print("Bypassing login for 'reform_server_1'...")
+            pause(1.5)
+            print("Analyzing network vulnerabilities...")
+            pause(2)
+            print("Weak point found in legacy authentication system. Injecting payload...")
+            pause(1.5)
+            print("ACCESS GRANTED: Root directory of /servers/reform_server_1/data/")
+            self._grant_initial_access()
+            print("\nYou can now 'cd' into '/servers/reform_server_1/data/' and use 'ls' to explore.")
+            print("Your next objective: Locate and 'cat' the 'project_ostrich_memo.txt'.")
+        else:
+            print("You already have access to the Reform server.")
+
+    def _grant_initial_access(self):
+        self.state['access_level'] = 1
+        self.state['access_granted'] = True
+        # Dynamically add the 'data' directory and 'project_ostrich_memo.txt' to the game state
+        self.mount_directory(*INITIAL_ACCESS_MOUNT)
+
+    def trigger_next_stage(self, filename):
+        """Enters the stage that reading filename completes, then any later stages already satisfied."""
+        state = self.state
+        stage = stage_engine.stage_for_file(filename, state['current_stage'], state['access_level'], state['unlocked_files'])
+        while stage is not None:
+            self.enter_stage(stage)
+            stage = stage_engine.next_stage(state['current_stage'], state['access_level'], state['unlocked_files'])
+
+    def enter_stage(self, stage):
+        self._apply_stage(stage)
+        self.schedule_upcoming()
+        for line in stage.messages:
+            print(line)
+
+    def _apply_stage(self, stage):
+        self.state['current_stage'] = stage.number
+        if stage.access_level is not None:
+            self.state['access_level'] = stage.access_level
+        self.contents.update(stage.contents) # Contents first, so mounted files are indexed with their bodies
+        for path, entries in stage.mounts.items():
+            self.mount_directory(path, entries)
+
+    def schedule_upcoming(self):
+        """Queues the bodies the next stages will add or mount for background preparation."""
+        if ingestor.workers <= 0:
+            return
+        current = self.state['current_stage']
+        mounts = [dict([INITIAL_ACCESS_MOUNT])] if not self.state['access_granted'] else []
+        upcoming = {}
+        for stage in stage_engine.successors(current):
+            upcoming.update(stage.contents)
+            mounts.append(stage.mounts)
+        for stage_mounts in mounts:
+            for entries in stage_mounts.values():
+                for key in layout_keys(entries):
+                    if key not in upcoming and key in self.contents:
+                        upcoming[key] = self.contents[key]
+        ingestor.submit(upcoming)
+
+    # --- Snapshots ---
+    def snapshot(self):
+        state = self.state
+        flags = FLAG_ACCESS_GRANTED if state['access_granted'] else 0
+        return Snapshot(get_scenario_fingerprint(), flags, state['access_level'], state['current_stage'],
+                        state['current_directory'], set(state['unlocked_files']))
+
+    def restore(self, snapshot):
+        """Replaces this session's game with a snapshot, re-applying the unlocks its progress implies."""
+        if snapshot.fingerprint != get_scenario_fingerprint():
+            raise ValueError("The snapshot was saved for a different scenario")
+        self.state = new_game_state()
+        self.contents = file_contents.overlay()
+        self.search_index = None
+        self.listings.clear()
+        if snapshot.flags & FLAG_ACCESS_GRANTED:
+            self._grant_initial_access()
+        for stage in stage_engine.path_to(snapshot.current_stage):
+            self._apply_stage(stage)
+        self.state['access_level'] = snapshot.access_level
+        self.state['unlocked_files'] = set(snapshot.unlocked_files)
+        directory = self.state['files'].resolve(snapshot.current_directory)
+        self.state['current_directory'] = snapshot.current_directory if directory is not None and directory.is_dir else "/"
+        self.schedule_upcoming()
+
+    def save_game(self, name=""):
+        path = self._save_path(name)
+        if path is not None:
+            write_snapshot(path, self.snapshot())
+            print(f"Progress saved to '{os.path.basename(path)}'.")
+
+    def load_game(self, name=""):
+        path = self._save_path(name)
+        if path is None:
+            return
+        try:
+            self.restore(read_snapshot(path))
+        except FileNotFoundError:
+            print(f"Error: No saved game named '{os.path.basename(path)}'.")
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not load '{os.path.basename(path)}': {e}")
+        else:
+            print(f"Progress restored from '{os.path.basename(path)}'. Stage {self.state['current_stage']}, access level {self.state['access_level']}.")
+
+    def _save_path(self, name):
+        if not SAVES_ENABLED:
+            print("Saving and loading are disabled on this server.")
+            return None
+        name = name.strip() or DEFAULT_SAVE_NAME
+        if os.path.basename(name) != name or name in (".", ".."):
+            print("Error: Save names cannot contain directories.")
+            return None
+        return os.path.join(SAVE_DIR, name)
+
+
+# 'access <target>' targets -> function(session)
+ACCESS_TARGETS = {
+    "reform_server_1_login": Session.attempt_initial_access,
+}
+
+def single_argument(name, args):
+    """The only argument of a command ("" if there is none), or None after printing its usage if there are more."""
+    if len(args) > 1:
+        print(f"Usage: {COMMANDS[name].usage} (quote names that contain spaces)")
+        return None
+    return args[0] if args else ""
+
+@register_command("ls", "ls [directory]", "List contents of current or specified directory.")
+def _command_ls(session, args):
+    path = single_argument("ls", args)
+    if path is not None:
+        session.list_directory(path)
+
+@register_command("cd", "cd <directory>", "Change current directory. Use '..' to go up.")
+def _command_cd(session, args):
+    path = single_argument("cd", args)
+    if path is not None:
+        session.change_directory(path)
+
+@register_command("cat", "cat <filename>", "View the content of a file.")
+def _command_cat(session, args):
+    path = single_argument("cat", args)
+    if path is not None:
+        session.view_file(path)
+
+@register_command("access", "access <target>", "Attempt to gain access to a system (e.g., 'access reform_server_1_login').")
+def _command_access(session, args):
+    target = ACCESS_TARGETS.get(args[0].lower()) if args else None
+    if target is None:
+        print(f"Access target '{' '.join(args)}' not recognized." if args else "Usage: access <target>")
+        return
+    target(session)
+
+@register_command("find", "find <keyword>", "Search for files containing a specific keyword.")
+def _command_find(session, args):
+    session.simulated_find(" ".join(args))
+
+@register_command("save", "save [name]", "Save your progress.")
+def _command_save(session, args):
+    name = single_argument("save", args)
+    if name is not None:
+        session.save_game(name)
+
+@register_command("load", "load [name]", "Restore saved progress.")
+def _command_load(session, args):
+    name = single_argument("load", args)
+    if name is not None:
+        session.load_game(name)
+
+@register_command("help", "help", "Display this help message.")
+def _command_help(session, args):
+    display_help()
+
+@register_command("exit", "exit", "Quit the simulator.")
+def _command_exit(session, args):
+    print("Exiting simulator. Remember the truth you uncovered.")
+    return False
+
+def load_plugins(names=None):
+    """Imports plugin modules (default: HACKSIM_PLUGINS); each registers its commands with register_command on import."""
+    sys.modules.setdefault("hacking_puzzle", sys.modules[__name__]) # So plugins share this module when it runs as a script
+    for name in PLUGINS if names is None else names:
+        importlib.import_module(name)
+
+
+def display_intro():
     print("\n[ INITIALIZING ETHICAL HACKING SIMULATOR ]")
     print("------------------------------------------")
     print(f"Loading environment... Theme: Trans (Blue)")
-    time.sleep(1)
+    pause(1)
     print("Welcome, Agent. You are connected to a simulated network.")
     print("Your mission: Uncover and expose the true agenda of Reform UK.")
     print("Type 'help' for a list of commands.")
     print("\nYour first task: Gain 'access' to 'reform_server_1_login'.")
+
+def game_loop(session=None):
+    session = session or Session()
+    display_intro()
     running = True
     while running:
-        display_prompt()
+        session.display_prompt()
         try:
             command = input().strip()
         except EOFError:
             break
         if not command:
             continue
-        running = handle_command(command)
-        # ADD THE DEBUG LINE HERE
-        print(f"DEBUG: Current Stage = {game_state.get('current_stage', 'Key Not Found')}")
-        time.sleep(0.2)
+        running = session.handle_command(command)
+        if DEBUG_STAGE:
+            print(f"DEBUG: Current Stage = {session.state['current_stage']}")
+        pause(0.2)
+
+# --- HEADLESS MODE ---
+def read_script(stream):
+    """Commands from a script: one per line; blank lines and '#' comments are skipped."""
+    return [line.strip() for line in stream if line.strip() and not line.lstrip().startswith("#")]
+
+def run_headless(commands, session=None):
+    """Plays the commands against a session (default: a new game) without delays.
+
+    Returns one result per command: {command, output, stage, access_level, elapsed_ms}. Stops
+    after 'exit'.
+    """
+    global COSMETIC_DELAYS
+    session = session or Session()
+    delays, COSMETIC_DELAYS = COSMETIC_DELAYS, False
+    results = []
+    try:
+        for command in commands:
+            output = io.StringIO()
+            start = time.perf_counter()
+            with redirect_stdout(output):
+                running = session.handle_command(command)
+            elapsed = time.perf_counter() - start
+            results.append({"command": command, "output": output.getvalue(), "stage": session.state['current_stage'],
+                            "access_level": session.state['access_level'], "elapsed_ms": elapsed * 1000})
+            if not running:
+                break
+    finally:
+        COSMETIC_DELAYS = delays
+    return results
+
+def summarize_results(playthroughs):
+    """Per-action command counts and timings across playthroughs."""
+    actions = {}
+    for results in playthroughs:
+        for result in results:
+            action = result['command'].split(' ', 1)[0].lower()
+            stats = actions.setdefault(action, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats['count'] += 1
+            stats['total_ms'] += result['elapsed_ms']
+            stats['max_ms'] = max(stats['max_ms'], result['elapsed_ms'])
+    total = sum(stats['count'] for stats in actions.values())
+    lines = [f"{len(playthroughs)} playthrough(s), {total} commands, "
+             f"final stage {playthroughs[-1][-1]['stage'] if playthroughs and playthroughs[-1] else 0}:"]
+    for action, stats in sorted(actions.items()):
+        lines.append(f"  {action:<8} {stats['count']:>8} calls, mean {stats['total_ms'] / stats['count']:.3f} ms, max {stats['max_ms']:.3f} ms")
+    return "\n".join(lines)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ethical hacking simulator.")
+    parser.add_argument("--script", metavar="FILE", help="Run headless: play the commands in FILE ('-' for stdin) without delays.")
+    parser.add_argument("--repeat", type=int, default=1, help="Headless playthroughs to run, each from a fresh game.")
+    parser.add_argument("--json", metavar="FILE", help="Write per-command headless results as JSON lines ('-' for stdout).")
+    parser.add_argument("--quiet", action="store_true", help="Do not print the headless transcript.")
+    parser.add_argument("--debug", action="store_true", help="Print the current stage after every command.")
+    parser.add_argument("--scenario", metavar="FILE", help="Play a scenario written by world_gen.py instead of the built-in story.")
+    parser.add_argument("--load", metavar="FILE", help="Start from a saved snapshot.")
+    parser.add_argument("--save", metavar="FILE", help="Headless: save a snapshot of the last playthrough when it ends.")
+    parser.add_argument("--profile", metavar="FILE", help="Headless: write per-command latency histograms as JSON ('-' for a text report on stderr).")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    global DEBUG_STAGE
+    args = parse_args(argv)
+    DEBUG_STAGE = DEBUG_STAGE or args.debug
+    load_plugins()
+    if args.scenario:
+        scenario = read_scenario(args.scenario)
+        load_scenario(scenario['layout'], scenario['contents'], scenario['stages'])
+    start = read_snapshot(args.load) if args.load else None
+
+    def new_session():
+        session = Session()
+        if start is not None:
+            session.restore(start)
+        return session
+
+    if not args.script:
+        game_loop(new_session())
+        return
+
+    if args.script == "-":
+        commands = read_script(sys.stdin)
+    else:
+        with open(args.script, "r", encoding="utf-8") as f:
+            commands = read_script(f)
+
+    if args.profile:
+        enable_profiling()
+    playthroughs = []
+    for _ in range(max(1, args.repeat)):
+        session = new_session()
+        playthroughs.append(run_headless(commands, session))
+    if args.save:
+        write_snapshot(args.save, session.snapshot())
+
+    if not args.quiet:
+        for result in playthroughs[-1]:
+            print(f"> {result['command']}")
+            print(result['output'], end="")
+            if DEBUG_STAGE:
+                print(f"DEBUG: Current Stage = {result['stage']}")
+    if args.json:
+        out = sys.stdout if args.json == "-" else open(args.json, "w", encoding="utf-8")
+        try:
+            for number, results in enumerate(playthroughs):
+                for result in results:
+                    out.write(json.dumps(dict(result, playthrough=number)) + "\n")
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    print(summarize_results(playthroughs), file=sys.stderr)
+    if args.profile == "-":
+        print(profiler.report(), file=sys.stderr)
+    elif args.profile:
+        with open(args.profile, "w", encoding="utf-8") as f:
+            json.dump(profiler.to_dict(), f, indent=2)
 
 if __name__ == "__main__":
-    game_loop()
\ No newline at end of file
+    main()
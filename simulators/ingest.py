@@ -0,0 +1,157 @@
+# simulators/ingest.py
+# Background preparation of story text for the hacking simulator.
+# When a player enters a stage, the contents of the stages that can follow it are handed to a
+# worker pool, which tokenises and lowercases each body into search weights and renders the text
+# 'cat' prints. By the time the player unlocks the next stage, indexing its files and viewing them
+# reuse that work instead of processing the text on the player's keystroke. Prepared bodies are
+# keyed by content key and shared by every session in the process; bodies viewed without being
+# queued are rendered once and kept too. Only the most recently used bodies are kept, so resident
+# memory stays bounded however large the scenario's packs are.
+#
+# Threads are the default: they use the time the player spends reading and typing (and, in the
+# server, waiting on the network). A process pool also runs in parallel with command handling.
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from search_index import body_weights
+
+FILE_VIEW_START = "\n--- FILE CONTENT START ---\n"
+FILE_VIEW_END = "\n--- FILE CONTENT END ---\n\n"
+
+
+def render_file(text):
+    """The text 'cat' writes for a body."""
+    return FILE_VIEW_START + text + FILE_VIEW_END
+
+
+def prepare(text):
+    """Worker task: (search weights, rendered text) for one body."""
+    return body_weights(text), render_file(text)
+
+
+class Prepared:
+    __slots__ = ('text', 'weights', 'rendered') # weights is None until a body that was only viewed is indexed
+
+    def __init__(self, text, weights, rendered):
+        self.text = text
+        self.weights = weights
+        self.rendered = rendered
+
+    def matches(self, text):
+        return self.text is text or self.text == text # A pack decodes a new string on every read
+
+
+class Ingestor:
+    """Prepares bodies in a worker pool ahead of use. With workers=0 everything is prepared on demand."""
+
+    def __init__(self, workers=1, processes=False, max_ready=256):
+        self.workers = workers
+        self.processes = processes
+        self.max_ready = max_ready
+        self.ready = OrderedDict() # content key -> Prepared, least recently used first
+        self.pending = {} # content key -> (text, Future)
+        self._executor = None
+
+    def __len__(self):
+        return len(self.ready) + len(self.pending)
+
+    def _pool(self):
+        if self._executor is None:
+            pool = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+            self._executor = pool(max_workers=self.workers)
+        return self._executor
+
+    def submit(self, contents):
+        """Schedules {key: text} bodies that are not prepared or queued yet. Returns how many were queued."""
+        if self.workers <= 0:
+            return 0
+        self._collect_finished()
+        queued = 0
+        for key, text in contents.items():
+            if text is None or key in self.pending:
+                continue
+            if self._get(key, text) is not None:
+                continue
+            self.pending[key] = (text, self._pool().submit(prepare, text))
+            queued += 1
+        return queued
+
+    def _get(self, key, text):
+        """The ready Prepared body for key if it was made from text, marking it recently used."""
+        prepared = self.ready.get(key)
+        if prepared is None or not prepared.matches(text):
+            return None
+        self.ready.move_to_end(key)
+        return prepared
+
+    def _store(self, key, prepared):
+        self.ready[key] = prepared
+        self.ready.move_to_end(key)
+        while len(self.ready) > self.max_ready:
+            self.ready.popitem(last=False)
+        return prepared
+
+    def _collect(self, key):
+        """Moves the queued body for key into ready if a worker has finished it.
+
+        A body no worker has started is withdrawn from the queue, so the caller prepares it itself
+        instead of waiting behind other queued work. Never blocks.
+        """
+        entry = self.pending.get(key)
+        if entry is None:
+            return
+        text, future = entry
+        if future.done():
+            del self.pending[key]
+            try:
+                weights, rendered = future.result()
+            except Exception: # A failed worker only costs the head start; the body is prepared on demand
+                return
+            self._store(key, Prepared(text, weights, rendered))
+        elif future.cancel():
+            del self.pending[key]
+
+    def _collect_finished(self):
+        """Moves every finished body into ready (and so under the max_ready bound)."""
+        for key in [key for key, (_, future) in self.pending.items() if future.done()]:
+            self._collect(key)
+
+    def prepared(self, key, text):
+        """The Prepared body for key: a worker's if it is finished, otherwise prepared here."""
+        self._collect_finished()
+        self._collect(key)
+        prepared = self._get(key, text)
+        if prepared is None:
+            prepared = self._store(key, Prepared(text, *prepare(text)))
+        elif prepared.weights is None:
+            prepared.weights = body_weights(text)
+        return prepared
+
+    def weights(self, key, text):
+        return self.prepared(key, text).weights
+
+    def rendered(self, key, text):
+        """Rendered text for a body. Never waits: rendering is cheap, so a body that is not ready is rendered here."""
+        entry = self.pending.get(key)
+        if entry is not None and entry[1].done():
+            self._collect(key)
+        prepared = self._get(key, text)
+        if prepared is not None:
+            return prepared.rendered
+        rendered = render_file(text)
+        if key not in self.pending: # A queued body will replace this with its weights
+            self._store(key, Prepared(text, None, rendered))
+        return rendered
+
+    def clear(self):
+        for _, future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+        self.ready.clear()
+
+    def close(self):
+        self.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,59 @@
+# simulators/render.py
+# Cached command output for the hacking simulator.
+# 'ls' listings are formatted once and kept until the filesystem they came from changes: every
+# mount bumps the filesystem's generation, and an entry is only served for the generation it was
+# rendered at. Listings of directories a session has not changed are the same for every player and
+# are shared. Output goes to stdout in one write; long 'cat' output can be paged in a terminal.
+
+import sys
+from collections import OrderedDict
+
+MORE_PROMPT = "-- More -- (Enter for the next page, q to stop) "
+
+
+class RenderCache:
+    """LRU of rendered text. An entry is only returned for the version it was rendered at."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict() # key -> (version, text)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, version):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, version, text):
+        self.entries[key] = (version, text)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return text
+
+    def clear(self):
+        self.entries.clear()
+
+
+def write(text, page_lines=0):
+    """Writes text in one call, or a page at a time when it is longer than page_lines and stdin and stdout are a terminal."""
+    out = sys.stdout
+    if page_lines <= 0 or text.count("\n") <= page_lines or not (out.isatty() and sys.stdin.isatty()):
+        out.write(text)
+        return
+    lines = text.splitlines(keepends=True)
+    for start in range(0, len(lines), page_lines):
+        out.write("".join(lines[start:start + page_lines]))
+        if start + page_lines >= len(lines):
+            break
+        try:
+            answer = input(MORE_PROMPT) # The same reader as the game loop, so typed-ahead input is not lost
+        except (EOFError, KeyboardInterrupt):
+            out.write("\n")
+            break
+        if answer.strip().lower() == "q":
+            break
@@ -0,0 +1,136 @@
+# simulators/search_index.py
+# Inverted index behind the simulator's 'find' command.
+# File names and bodies are tokenised once when a file is added; a query then only touches the
+# postings of its terms. Every query term also matches longer words that start with it ("lib"
+# finds "liberty"), with exact words ranked above prefix matches, and multi-term queries return
+# only files that match every term, ranked by tf-idf. An index can be layered over a shared base
+# index, so each player session only stores the files it has added or replaced.
+
+import math
+import re
+from bisect import bisect_left
+from collections import Counter
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+NAME_WEIGHT = 3.0 # A name match outranks a word repeated several times in the body
+PREFIX_WEIGHT = 0.5
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def body_weights(text):
+    """{term: log-damped frequency} for a body. Independent of the file name, so it can be computed ahead of time."""
+    return {term: 1.0 + math.log(count) for term, count in Counter(tokenize(text)).items()}
+
+
+def term_weights(name, text=None, body=None):
+    """Returns {term: weight} for one document: log-damped body frequency plus a bonus for name terms.
+
+    body is the precomputed body_weights(text), if there is one.
+    """
+    if body is not None:
+        weights = dict(body)
+    else:
+        weights = body_weights(text) if text else {}
+    for term in set(tokenize(name)):
+        weights[term] = weights.get(term, 0.0) + NAME_WEIGHT
+    return weights
+
+
+class SearchIndex:
+    """Postings {term: {doc_id: weight}} with incremental add/remove and ranked prefix search.
+
+    With a base index, documents are looked up in this index first and then in the base; the base
+    is only read, and base documents this index removes or replaces are hidden.
+    """
+
+    def __init__(self, base=None):
+        self.base = base
+        self.postings = {}
+        self.documents = {} # doc_id -> terms, so a document can be removed again
+        self.hidden = set() # Base documents removed or replaced by this index
+        self._sorted_terms = []
+        self._terms_dirty = False
+
+    def __len__(self):
+        if self.base is None:
+            return len(self.documents)
+        return len(self.documents) + len(self.base) - len(self.hidden)
+
+    def add(self, doc_id, name, text=None, body=None):
+        """Indexes (or re-indexes) a document from its name and optional body text (or precomputed body weights)."""
+        if doc_id in self.documents:
+            self.remove(doc_id)
+        if self.base is not None and doc_id in self.base.documents:
+            self.hidden.add(doc_id)
+        weights = term_weights(name, text, body)
+        for term, weight in weights.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                self._terms_dirty = True
+            postings[doc_id] = weight
+        self.documents[doc_id] = tuple(weights)
+
+    def remove(self, doc_id):
+        for term in self.documents.pop(doc_id, ()):
+            postings = self.postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self.postings[term]
+                self._terms_dirty = True
+        if self.base is not None and doc_id in self.base.documents:
+            self.hidden.add(doc_id)
+
+    def _expand(self, term):
+        """Returns the indexed terms (here or in the base) equal to or starting with term."""
+        if self._terms_dirty:
+            self._sorted_terms = sorted(self.postings)
+            self._terms_dirty = False
+        terms = self._sorted_terms
+        i = bisect_left(terms, term)
+        expanded = []
+        while i < len(terms) and terms[i].startswith(term):
+            expanded.append(terms[i])
+            i += 1
+        if self.base is not None:
+            expanded = sorted(set(expanded).union(self.base._expand(term)))
+        return expanded
+
+    def _postings(self, term):
+        """(doc_id, weight) pairs for a term, with hidden base documents left out."""
+        own = self.postings.get(term, {})
+        if self.base is None:
+            return list(own.items())
+        pairs = list(own.items())
+        pairs.extend((doc_id, weight) for doc_id, weight in self.base._postings(term) if doc_id not in self.hidden)
+        return pairs
+
+    def search(self, query, limit=None):
+        """Returns [(doc_id, score)] for documents matching every query term, best first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        total = len(self)
+        scores = None
+        for term in dict.fromkeys(terms):
+            term_scores = {}
+            for indexed in self._expand(term):
+                postings = self._postings(indexed)
+                if not postings:
+                    continue
+                idf = math.log(1.0 + total / len(postings))
+                if indexed != term:
+                    idf *= PREFIX_WEIGHT
+                for doc_id, weight in postings:
+                    term_scores[doc_id] = term_scores.get(doc_id, 0.0) + weight * idf
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc_id: score + term_scores[doc_id] for doc_id, score in scores.items() if doc_id in term_scores}
+            if not scores:
+                return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit else ranked
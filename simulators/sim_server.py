@@ -0,0 +1,149 @@
+# simulators/sim_server.py
+# Hosts many hacking simulator sessions in one process over a plain-text TCP protocol.
+# Every connection gets its own Session: the world and story text are shared, and each session
+# only keeps its position, progress and the directories it has unlocked. Commands run to
+# completion on the event loop (cosmetic pauses are turned off), so one process serves
+# thousands of players. The listener only binds to loopback addresses.
+#
+# Usage:
+#   python simulators/sim_server.py [--host 127.0.0.1] [--port 8023] [--max-sessions 2000]
+#   nc 127.0.0.1 8023
+
+import argparse
+import asyncio
+import io
+import ipaddress
+import time
+from collections import deque
+from contextlib import redirect_stdout
+
+import hacking_puzzle
+from hacking_puzzle import Session
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8023
+IDLE_TIMEOUT = 900 # Seconds without a command before a session is dropped
+MAX_LINE = 4096
+LATENCY_WINDOW = 100000 # Recent command latencies kept for stats()
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def capture(func, *args):
+    """Runs func with stdout captured. Returns (captured text, return value)."""
+    output = io.StringIO()
+    with redirect_stdout(output): # Safe: commands never yield to the event loop
+        result = func(*args)
+    return output.getvalue(), result
+
+
+class SimulatorServer:
+    """asyncio server with one Session per connection and per-command latency tracking."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, max_sessions=2000, idle_timeout=IDLE_TIMEOUT):
+        if not is_loopback(host):
+            raise ValueError(f"Refusing to listen on non-loopback address {host!r}")
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sessions = set()
+        self.total_sessions = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW) # Seconds spent in handle_command per recent command
+        self._server = None
+
+    async def start(self):
+        hacking_puzzle.COSMETIC_DELAYS = False # A sleeping command would stall every other session
+        hacking_puzzle.SAVES_ENABLED = False # Players must not write files on the host
+        self._server = await asyncio.start_server(self._serve, self.host, self.port, limit=MAX_LINE, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def execute(self, session, command):
+        """Runs one command for a session. Returns (output including the next prompt, still running)."""
+        start = time.perf_counter()
+        output, running = capture(session.handle_command, command)
+        self.latencies.append(time.perf_counter() - start)
+        if running:
+            output += capture(session.display_prompt)[0]
+        return output, running
+
+    async def _serve(self, reader, writer):
+        if len(self.sessions) >= self.max_sessions:
+            writer.write(b"Server full. Try again later.\n")
+            await writer.drain()
+            writer.close()
+            return
+        session = Session()
+        self.sessions.add(session)
+        self.total_sessions += 1
+        try:
+            writer.write((capture(hacking_puzzle.display_intro)[0] + capture(session.display_prompt)[0]).encode("utf-8"))
+            await writer.drain()
+            running = True
+            while running:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except (asyncio.TimeoutError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if not line:
+                    break
+                command = line.decode("utf-8", errors="replace").strip()
+                if command:
+                    output, running = self.execute(session, command)
+                else:
+                    output = capture(session.display_prompt)[0]
+                writer.write(output.encode("utf-8"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.discard(session)
+            writer.close()
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+        return {"active_sessions": len(self.sessions), "total_sessions": self.total_sessions, "commands": len(latencies),
+                "p50_ms": percentile(0.50), "p99_ms": percentile(0.99), "max_ms": latencies[-1] * 1000 if latencies else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve hacking simulator sessions over TCP (loopback only).")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-sessions", type=int, default=2000)
+    args = parser.parse_args()
+    if not is_loopback(args.host):
+        parser.error(f"--host must be a loopback address, got {args.host!r}")
+    hacking_puzzle.load_plugins()
+
+    async def run():
+        server = await SimulatorServer(args.host, args.port, args.max_sessions).start()
+        print(f"Simulator listening on {server.host}:{server.port} (max {server.max_sessions} sessions)")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
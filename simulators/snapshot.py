@@ -0,0 +1,136 @@
+# simulators/snapshot.py
+# Compact, versioned binary snapshots of a simulator session.
+# A snapshot is a delta against the base scenario: it stores the player's progress (access level,
+# stage, directory and the files they have read), not the world. Directories and contents that
+# stages unlocked are re-applied from the scenario on restore, so the size of a snapshot grows
+# with the player's progress rather than with the size of the world.
+#
+#   b"HSSN" | version u8 | scenario fingerprint (8 bytes) | flags u8 | access level varint
+#   | stage varint | current directory str | unlocked file count varint | file names str...
+#
+# Strings are a varint byte length followed by UTF-8.
+
+import hashlib
+import json
+import os
+import tempfile
+
+MAGIC = b"HSSN"
+SNAPSHOT_VERSION = 1
+FLAG_ACCESS_GRANTED = 0x01 # The initial server access has been granted
+
+
+class Snapshot:
+    __slots__ = ('fingerprint', 'flags', 'access_level', 'current_stage', 'current_directory', 'unlocked_files')
+
+    def __init__(self, fingerprint, flags, access_level, current_stage, current_directory, unlocked_files):
+        self.fingerprint = fingerprint
+        self.flags = flags
+        self.access_level = access_level
+        self.current_stage = current_stage
+        self.current_directory = current_directory
+        self.unlocked_files = unlocked_files
+
+    def __repr__(self):
+        return (f"Snapshot(stage={self.current_stage}, access={self.access_level}, "
+                f"dir={self.current_directory!r}, {len(self.unlocked_files)} files read)")
+
+
+def scenario_fingerprint(layout, stages):
+    """8-byte digest of a scenario's world layout and stage structure; a snapshot only restores onto the same scenario.
+
+    Stage contents and messages are left out, so editing story text does not invalidate saves.
+    """
+    structure = [{key: value for key, value in stage.items() if key not in ('contents', 'messages')} for stage in stages]
+    data = json.dumps({"layout": layout, "stages": structure}, sort_keys=True, separators=(",", ":"), default=sorted)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=8).digest()
+
+
+# --- Encoding ---
+def _write_varint(out, value):
+    if value < 0:
+        raise ValueError("varints must be non-negative")
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_str(out, text):
+    data = text.encode("utf-8")
+    _write_varint(out, len(data))
+    out += data
+
+
+def _read_varint(data, position):
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def _read_str(data, position):
+    length, position = _read_varint(data, position)
+    end = position + length
+    if end > len(data):
+        raise ValueError("Truncated snapshot")
+    return data[position:end].decode("utf-8"), end
+
+
+def encode(snapshot):
+    out = bytearray(MAGIC)
+    out.append(SNAPSHOT_VERSION)
+    out += snapshot.fingerprint
+    out.append(snapshot.flags)
+    _write_varint(out, snapshot.access_level)
+    _write_varint(out, snapshot.current_stage)
+    _write_str(out, snapshot.current_directory)
+    _write_varint(out, len(snapshot.unlocked_files))
+    for name in sorted(snapshot.unlocked_files):
+        _write_str(out, name)
+    return bytes(out)
+
+
+def decode(data):
+    """Parses a snapshot. Raises ValueError for anything that is not a valid version 1 snapshot."""
+    if data[:4] != MAGIC:
+        raise ValueError("Not a simulator snapshot")
+    if len(data) < 14 or data[4] != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {data[4] if len(data) > 4 else '?'}")
+    try:
+        fingerprint = bytes(data[5:13])
+        flags = data[13]
+        access_level, position = _read_varint(data, 14)
+        current_stage, position = _read_varint(data, position)
+        current_directory, position = _read_str(data, position)
+        count, position = _read_varint(data, position)
+        unlocked = set()
+        for _ in range(count):
+            name, position = _read_str(data, position)
+            unlocked.add(name)
+    except IndexError:
+        raise ValueError("Truncated snapshot") from None
+    return Snapshot(fingerprint, flags, access_level, current_stage, current_directory, unlocked)
+
+
+# --- Files ---
+def write_snapshot(path, snapshot):
+    """Writes a snapshot atomically."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(encode(snapshot))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_snapshot(path):
+    with open(path, "rb") as f:
+        return decode(f.read())
@@ -0,0 +1,91 @@
+# simulators/stages.py
+# Data-driven story progression for the hacking simulator.
+# Stages are declared as plain dicts (which stage they follow, the files that must have been read,
+# the directories and contents they unlock, the messages they print) and compiled once into
+# Stage records. The engine keeps reverse indexes from file name and from stage number to the
+# stages that depend on them, so reading a file only re-checks the stages that file can unlock.
+
+
+class Stage:
+    __slots__ = ('number', 'after', 'requires', 'min_access', 'access_level', 'mounts', 'contents', 'messages')
+
+    def __init__(self, number, after, requires, min_access, access_level, mounts, contents, messages):
+        self.number = number
+        self.after = after
+        self.requires = requires
+        self.min_access = min_access
+        self.access_level = access_level
+        self.mounts = mounts
+        self.contents = contents
+        self.messages = messages
+
+    def __repr__(self):
+        return f"Stage({self.number})"
+
+
+def compile_stage(spec):
+    """Turns one stage dict into a Stage; 'after' defaults to the previous stage number."""
+    number = spec['number']
+    return Stage(
+        number=number,
+        after=spec.get('after', number - 1),
+        requires=frozenset(spec.get('requires', ())),
+        min_access=spec.get('min_access', 0),
+        access_level=spec.get('access_level'),
+        mounts=spec.get('mounts', {}),
+        contents=spec.get('contents', {}),
+        messages=tuple(spec.get('messages', ())),
+    )
+
+
+class StageEngine:
+    """Decides which stages a player enters as they read files."""
+
+    def __init__(self, specs):
+        self.stages = {}
+        self.by_file = {} # file name -> stages that require it
+        self.by_previous = {} # stage number -> stages that follow it
+        for spec in specs:
+            stage = compile_stage(spec)
+            if stage.number in self.stages:
+                raise ValueError(f"Duplicate stage number {stage.number}")
+            self.stages[stage.number] = stage
+            for name in stage.requires:
+                self.by_file.setdefault(name, []).append(stage)
+            self.by_previous.setdefault(stage.after, []).append(stage)
+
+    def __len__(self):
+        return len(self.stages)
+
+    @staticmethod
+    def is_ready(stage, current_stage, access_level, unlocked_files):
+        return (stage.after == current_stage and access_level >= stage.min_access
+                and stage.requires <= unlocked_files)
+
+    def stage_for_file(self, name, current_stage, access_level, unlocked_files):
+        """Returns the stage reading this file completes, or None. Only stages that require the file are checked."""
+        for stage in self.by_file.get(name, ()):
+            if self.is_ready(stage, current_stage, access_level, unlocked_files):
+                return stage
+        return None
+
+    def next_stage(self, current_stage, access_level, unlocked_files):
+        """Returns a stage that follows current_stage and whose requirements are already met (e.g. files read early), or None."""
+        for stage in self.by_previous.get(current_stage, ()):
+            if self.is_ready(stage, current_stage, access_level, unlocked_files):
+                return stage
+        return None
+
+    def successors(self, number):
+        return self.by_previous.get(number, [])
+
+    def path_to(self, number):
+        """The stages entered, in order, to reach stage number (each stage follows exactly one other)."""
+        path = []
+        while number in self.stages and len(path) <= len(self.stages):
+            stage = self.stages[number]
+            path.append(stage)
+            number = stage.after
+        if len(path) > len(self.stages):
+            raise ValueError(f"Stage {path[0].number} is part of a cycle")
+        return path[::-1]
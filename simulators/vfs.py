@@ -0,0 +1,241 @@
+# simulators/vfs.py
+# In-memory virtual filesystem for the hacking simulator.
+# Directories and files are __slots__ nodes linked by parent pointers. Path strings are normalised by
+# normalize_path, an LRU cache shared by every filesystem and session, so resolving a path the game
+# has seen before costs one dict lookup per component. Worlds are still written in the old layout
+# shape ({"/dir/": {"file.txt": "...", "sub/": {}}}) and built with VirtualFS.from_layout.
+# OverlayFS gives each player session a copy-on-write view of one shared world.
+
+import functools
+
+
+class Node:
+    __slots__ = ('name', 'parent')
+
+    def __init__(self, name, parent):
+        self.name = name
+        self.parent = parent
+
+
+class Directory(Node):
+    __slots__ = ('children',)
+    is_dir = True
+
+    def __init__(self, name, parent):
+        super().__init__(name, parent)
+        self.children = {}
+
+    def __repr__(self):
+        return f"Directory({self.name!r}, {len(self.children)} entries)"
+
+
+class File(Node):
+    """A file; data is either a key into the simulator's file contents or a short inline description."""
+
+    __slots__ = ('data',)
+    is_dir = False
+
+    def __init__(self, name, parent, data):
+        super().__init__(name, parent)
+        self.data = data
+
+    def __repr__(self):
+        return f"File({self.name!r})"
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_path(cwd, path):
+    """Components of path (absolute, or relative to the absolute directory cwd) with '.' and '..' resolved.
+
+    Pure string work, so results are shared by every session; '..' at the root stays at the root.
+    """
+    parts = [] if path.startswith("/") else [part for part in cwd.split("/") if part and part != "."]
+    for part in path.split("/"):
+        if not part or part == ".":
+            continue
+        if part == "..":
+            if parts:
+                parts.pop()
+            continue
+        parts.append(part)
+    return tuple(parts)
+
+
+def entry_name(node):
+    """The name shown by ls: directories keep their trailing '/'."""
+    return node.name + "/" if node.is_dir else node.name
+
+
+class VirtualFS:
+    """A tree of Directory/File nodes rooted at '/'."""
+
+    def __init__(self):
+        self.root = Directory("", None)
+        self.node_count = 1
+        self.generation = 0 # Bumped on every change, so cached renderings can tell they are stale
+
+    @classmethod
+    def from_layout(cls, layout):
+        """Builds a filesystem from {"/abs/dir/": {name: data or {} for subdirectories}}."""
+        fs = cls()
+        for path, entries in layout.items():
+            fs.populate(fs.makedirs(path), entries)
+        return fs
+
+    def __len__(self):
+        return self.node_count
+
+    # --- Lookup ---
+    def child(self, directory, name):
+        return directory.children.get(name)
+
+    def resolve(self, path, cwd="/"):
+        """Returns the node at path (absolute, or relative to the directory path cwd), or None."""
+        return self.lookup(normalize_path(cwd, path))
+
+    def lookup(self, parts):
+        """Returns the node at the normalised path components parts, or None."""
+        node = self.root
+        for part in parts:
+            if not node.is_dir:
+                return None
+            node = self.child(node, part)
+            if node is None:
+                return None
+        return node
+
+    def path_of(self, node):
+        """Absolute path of a node; directories end with '/'."""
+        parts = []
+        current = node
+        while current.parent is not None:
+            parts.append(current.name)
+            current = current.parent
+        path = "/" + "/".join(reversed(parts))
+        if node.is_dir and path != "/":
+            path += "/"
+        return path
+
+    def listdir(self, directory):
+        return list(directory.children.values())
+
+    def walk_files(self, top=None):
+        """Yields every File under top (default: the root), depth first."""
+        stack = [top or self.root]
+        while stack:
+            directory = stack.pop()
+            for node in self.listdir(directory):
+                if node.is_dir:
+                    stack.append(node)
+                else:
+                    yield node
+
+    # --- Mutation ---
+    def makedirs(self, path):
+        """Returns the directory at an absolute path, creating missing directories along the way."""
+        directory = self.root
+        for part in path.split("/"):
+            if not part:
+                continue
+            node = self.child(directory, part)
+            if node is None:
+                node = Directory(part, directory)
+                self._attach(directory, node)
+            elif not node.is_dir:
+                raise NotADirectoryError(self.path_of(node))
+            directory = node
+        return directory
+
+    def populate(self, directory, entries):
+        """Adds layout entries ("name": data, "sub/": {...}) to a directory, merging into existing subdirectories."""
+        for name, value in entries.items():
+            if name.endswith("/") and isinstance(value, dict):
+                subdir = self.child(directory, name[:-1])
+                if subdir is None or not subdir.is_dir:
+                    subdir = Directory(name[:-1], directory)
+                    self._attach(directory, subdir)
+                self.populate(subdir, value)
+            else:
+                self._attach(directory, File(name, directory, value))
+
+    def mount(self, path, entries):
+        """Replaces (or creates) the directory at path with the given layout entries. Returns it."""
+        path = path.rstrip("/")
+        parent_path, _, name = path.rpartition("/")
+        parent = self.makedirs(parent_path or "/")
+        directory = Directory(name, parent)
+        self._attach(parent, directory)
+        self.populate(directory, entries)
+        return directory
+
+    def _attach(self, directory, node):
+        replaced = self.child(directory, node.name)
+        if replaced is not None:
+            self.node_count -= self._subtree_size(replaced)
+        self._set_child(directory, node)
+        self.node_count += 1
+        self.generation += 1
+
+    def _set_child(self, directory, node):
+        directory.children[node.name] = node
+
+    def _subtree_size(self, node):
+        if not node.is_dir:
+            return 1
+        size, stack = 1, [node]
+        while stack:
+            for child in self.listdir(stack.pop()):
+                size += 1
+                if child.is_dir:
+                    stack.append(child)
+        return size
+
+
+class OverlayFS(VirtualFS):
+    """Copy-on-write view of a shared base filesystem.
+
+    The base is never modified. Entries added under a base directory are kept in a per-view
+    overlay ({base directory: {name: node}}); directories created by the view are private to it
+    and modified in place. Private nodes point at their (possibly shared) parents, so path_of and
+    '..' work across the boundary.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.root = base.root
+        self.node_count = base.node_count
+        self.generation = 0
+        self.overlay = {}
+        self._private = set()
+
+    def child(self, directory, name):
+        entries = self.overlay.get(directory)
+        if entries is not None:
+            node = entries.get(name)
+            if node is not None:
+                return node
+        return directory.children.get(name)
+
+    def listdir(self, directory):
+        entries = self.overlay.get(directory)
+        if not entries:
+            return list(directory.children.values())
+        merged = dict(directory.children)
+        merged.update(entries)
+        return list(merged.values())
+
+    def _set_child(self, directory, node):
+        if node.is_dir:
+            self._private.add(node)
+        if directory in self._private:
+            directory.children[node.name] = node
+        else:
+            self.overlay.setdefault(directory, {})[node.name] = node
+
+    def is_shared(self, directory):
+        """True if the view lists directory exactly as the base does (it has no entries of its own there)."""
+        return directory not in self.overlay and directory not in self._private
+
+    def delta_size(self):
+        """Nodes owned by this view (overlay entries and everything under private directories)."""
+        return sum(self._subtree_size(node) for entries in self.overlay.values() for node in entries.values())
@@ -0,0 +1,143 @@
+# simulators/world_gen.py
+# Seeded generator for large hacking simulator scenarios, used to stress the hot paths.
+# A scenario has the same three parts as the built-in story: a world layout
+# ({"/dir/": {"file.txt": content key, "sub/": {}}}), the file contents ({content key: text}) and the
+# stage list. Stage N mounts /stage_N/ and is entered once the required files of the previous
+# stage's directory (or, for stage 1, of the base world) have been read. The same seed and settings
+# always produce the same scenario.
+#
+# Usage:
+#   python simulators/world_gen.py --nodes 100000 --seed 1 --out scenario.json
+#   python simulators/hacking_puzzle.py --scenario scenario.json
+
+import argparse
+import json
+import os
+import random
+import tempfile
+
+SYLLABLES = ("ka", "lo", "mi", "nu", "ra", "se", "ti", "vo", "xe", "zu", "pe", "da", "fi", "go", "ha", "ju")
+VOCABULARY_SIZE = 2000 # Distinct words in generated names and bodies
+
+
+def vocabulary(rng, size=VOCABULARY_SIZE):
+    """size distinct pseudo-words of two to four syllables."""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def body(rng, words, size):
+    """size words of text, a few per line. The first half of the vocabulary is far more common than the rest."""
+    common = len(words) // 2
+    chosen = [words[rng.randrange(common)] if rng.random() < 0.9 else words[rng.randrange(len(words))] for _ in range(size)]
+    return "\n".join(" ".join(chosen[i:i + 12]) for i in range(0, size, 12)) + "\n"
+
+
+def directory_paths(depth, fanout):
+    """Absolute paths of every directory in a tree of the given depth and fan-out, root first, breadth first."""
+    paths, level = ["/"], ["/"]
+    for _ in range(depth):
+        level = [f"{parent}dir_{i}/" for parent in level for i in range(fanout)]
+        paths.extend(level)
+    return paths
+
+
+def shape_for_nodes(nodes, fanout=10, files_per_dir=10):
+    """Depth and file count for a world of about `nodes` nodes with roughly files_per_dir files per directory."""
+    depth, directories = 1, 1 + fanout
+    while directories + fanout ** (depth + 1) <= nodes // (files_per_dir + 1):
+        depth += 1
+        directories += fanout ** depth
+    return {"depth": depth, "fanout": fanout, "files": max(0, nodes - directories)}
+
+
+def generate_world(seed=0, depth=3, fanout=4, files=1000, content_size=64, stages=4, files_per_stage=10,
+                   distinct_bodies=1000, required_per_stage=2):
+    """Returns {"layout": ..., "contents": ..., "stages": ...} for a world of 1 + fanout + ... + fanout**depth
+    directories holding `files` files, plus `stages` stages that each mount files_per_stage files.
+
+    Base world files share distinct_bodies bodies of content_size words, so large worlds stay cheap to hold.
+    """
+    if min(depth, fanout, files, content_size, stages, distinct_bodies) < 0 or required_per_stage > files_per_stage:
+        raise ValueError("Invalid world settings")
+    rng = random.Random(seed)
+    words = vocabulary(rng)
+    paths = directory_paths(depth, fanout)
+    layout = {path: {} for path in paths}
+    for path in paths[1:]:
+        parent, _, name = path[:-1].rpartition("/")
+        layout[parent + "/"][name + "/"] = {}
+
+    contents = {f"body_{i}": body(rng, words, content_size) for i in range(min(distinct_bodies, files) or 1)}
+    names = []
+    for i in range(files):
+        name = f"{rng.choice(words)}_{i}.txt"
+        layout[paths[rng.randrange(len(paths))]][name] = f"body_{i % len(contents)}"
+        names.append(name)
+
+    stage_specs = []
+    required = rng.sample(names, min(required_per_stage, len(names))) # Stage 1 is unlocked from the base world
+    for number in range(1, stages + 1):
+        entries = {}
+        for i in range(files_per_stage):
+            name = f"stage{number}_{rng.choice(words)}_{i}.txt"
+            entries[name] = name
+        stage_specs.append({
+            "number": number,
+            "requires": required,
+            "access_level": number + 1, # Like the built-in story, 'find' (access level 2) works from stage 1 on
+            "mounts": {f"/stage_{number}/": entries},
+            "contents": {name: body(rng, words, content_size) for name in entries},
+            "messages": [f"\n--- STAGE {number} UNLOCKED ---", f"New files are waiting in /stage_{number}/."],
+        })
+        required = rng.sample(sorted(entries), required_per_stage)
+    return {"layout": layout, "contents": contents, "stages": stage_specs}
+
+
+def node_count(scenario):
+    """Nodes in the base world (directories, including the root, plus files)."""
+    return 1 + sum(len(entries) for entries in scenario['layout'].values())
+
+
+def write_scenario(path, scenario):
+    """Writes a scenario as JSON, atomically."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".scenario-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(scenario, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_scenario(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a seeded hacking simulator scenario.")
+    parser.add_argument("--out", required=True, metavar="FILE", help="Where to write the scenario JSON.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--nodes", type=int, help="Approximate world size; sets --depth and --files with a fan-out of 10.")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--content-size", type=int, default=64, help="Words per file body.")
+    parser.add_argument("--stages", type=int, default=4)
+    parser.add_argument("--files-per-stage", type=int, default=10)
+    args = parser.parse_args()
+
+    shape = shape_for_nodes(args.nodes) if args.nodes else {"depth": args.depth, "fanout": args.fanout, "files": args.files}
+    scenario = generate_world(seed=args.seed, content_size=args.content_size, stages=args.stages,
+                              files_per_stage=args.files_per_stage, **shape)
+    write_scenario(args.out, scenario)
+    print(f"Wrote {args.out}: {node_count(scenario):,} nodes, {len(scenario['contents']):,} bodies, {len(scenario['stages'])} stages")
+
+
+if __name__ == "__main__":
+    main()